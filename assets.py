@@ -0,0 +1,34 @@
+import tkinter as tk
+
+class ImageCache:
+    """ decodes every image file once per process and keeps each subsampled size it was asked for
+
+    PhotoImages belong to the Tk root they were created under, so the cache
+    starts over if it is used from a different root.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.images = {}
+
+    def get(self, master, path, factor=1) -> tk.PhotoImage:
+        root = master._root()
+        if root is not self.root:
+            self.root = root
+            self.images = {}
+        key = (path, factor)
+        if key not in self.images:
+            if factor == 1:
+                self.images[key] = tk.PhotoImage(master=root, file=path)
+            else:
+                self.images[key] = self.get(master, path).subsample(factor)
+        return self.images[key]
+
+    def fitted(self, master, path, width, height) -> tk.PhotoImage:
+        """ the image shrunk by the smallest whole factor that fits it in width x height """
+        image = self.get(master, path)
+        factor = max(-(-image.width() // width), -(-image.height() // height), 1)
+        return self.get(master, path, factor)
+
+
+images = ImageCache()
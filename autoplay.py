@@ -0,0 +1,102 @@
+import queue
+import threading
+
+import config
+from selfplay import SolverPlayer
+
+class AutoPlayer:
+    """ plays the current game from a background thread while Tk stays responsive
+
+    The Tk thread hands the worker a copy of what a player can see, the worker
+    runs the solver on it and puts the resulting moves on a queue, and the Tk
+    thread polls that queue with root.after and applies them through the
+    GameManager click handlers. The worker never touches the live game state.
+    moves_per_second limits how fast moves are applied; None applies every
+    move as soon as the solver produces it.
+    """
+
+    UNTHROTTLED_POLL_MS = 1
+
+    def __init__(self, controller, moves_per_second=config.AI_MOVES_PER_SECOND):
+        self.controller = controller
+        self.root = controller.root
+        self.moves_per_second = moves_per_second
+
+        self.requests = queue.Queue()
+        self.moves = queue.Queue()
+        self.pending = []
+        self.waiting_for_moves = False
+        self.running = False
+
+        self.player = SolverPlayer()
+        self.worker = threading.Thread(target=self.solve_loop, daemon=True)
+
+    @property
+    def poll_interval(self) -> int:
+        if not self.moves_per_second:
+            return self.UNTHROTTLED_POLL_MS
+        return max(int(1000 / self.moves_per_second), 1)
+
+    def start(self) -> None:
+        self.running = True
+        self.worker.start()
+        self.request_moves()
+        self.root.after(self.poll_interval, self.poll)
+
+    def stop(self) -> None:
+        self.running = False
+        self.requests.put(None)
+
+    def request_moves(self) -> None:
+        logic = self.controller.logic
+        self.waiting_for_moves = True
+        self.requests.put((logic.board.observed_copy(), logic.num_mines))
+
+    def solve_loop(self) -> None:
+        """ worker thread: turn each board snapshot into a list of moves """
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            board, num_mines = request
+            if not board.revealed.any():
+                center = (board.rows // 2, board.columns // 2)
+                self.moves.put([('reveal', center)])
+                continue
+
+            cells, _ = self.player.next_moves(board, num_mines)
+            moves = [('flag', cell) for cell in sorted(self.player.known_mines) if not board.flagged[cell]]
+            moves += [('reveal', cell) for cell in cells]
+            self.moves.put(moves)
+
+    def game_over(self) -> bool:
+        logic = self.controller.logic
+        return not logic.running or logic.check_for_win()
+
+    def poll(self) -> None:
+        """ Tk thread: apply queued moves, one per tick when throttled or all of them when not """
+        if not self.running:
+            return
+        if self.game_over():
+            self.stop()
+            return
+
+        try:
+            while True:
+                self.pending.extend(self.moves.get_nowait())
+                self.waiting_for_moves = False
+        except queue.Empty:
+            pass
+
+        while self.pending and not self.game_over():
+            kind, (row, column) = self.pending.pop(0)
+            if kind == 'flag':
+                self.controller.on_right_click(row, column)(None)
+            else:
+                self.controller.on_left_click(row, column)(None)
+            if self.moves_per_second:
+                break
+
+        if not self.pending and not self.waiting_for_moves and not self.game_over():
+            self.request_moves()
+        self.root.after(self.poll_interval, self.poll)
@@ -0,0 +1,158 @@
+import argparse
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+import config
+from logic import MinesweeperLogic
+
+SYNTHETIC_SIZES = [100, 500, 1000, 2000]
+SYNTHETIC_DENSITY = 0.15
+
+OPERATIONS = ['create_board', 'fill_board', 'reveal_cell', 'clear_adjacent_cells',
+              'count_current_score', 'check_for_win']
+
+# a median this much slower than the compared run is reported as a regression,
+# unless it only grew by less than the floor (timer noise on sub-millisecond calls)
+REGRESSION_RATIO = 1.2
+REGRESSION_FLOOR = 1e-4
+
+def new_logic(size, mines, seed) -> MinesweeperLogic:
+    logic = MinesweeperLogic(None, seed=seed)
+    logic.set_difficulty(size)
+    logic.set_mines(mines)
+    return logic
+
+def measure(operation, repeats, setup=None) -> dict:
+    """ time an operation several times, running the untimed setup before each call """
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return {'min': min(samples), 'median': statistics.median(samples),
+            'mean': statistics.fmean(samples), 'repeats': repeats}
+
+def peak_board_memory(size, mines, seed) -> int:
+    """ peak bytes allocated while creating, filling and opening one board """
+    tracemalloc.start()
+    logic = new_logic(size, mines, seed)
+    logic.create_board()
+    center = size // 2
+    logic.reveal_cell(center, center)
+    if logic.select_cell(center, center).is_empty:
+        logic.clear_adjacent_cells(center, center)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def benchmark_board(name, size, mines, repeats, seed=0) -> dict:
+    center = size // 2
+    logic = new_logic(size, mines, seed)
+    timings = {}
+
+    timings['create_board'] = measure(logic.create_board, repeats)
+
+    def fresh_board():
+        logic.create_board()
+        logic.board.revealed[center, center] = True
+    timings['fill_board'] = measure(lambda: logic.fill_board(center, center), repeats, fresh_board)
+
+    # every remaining operation runs against the same filled board, restored before each call
+    logic.create_board()
+    logic.reveal_cell(center, center)
+    board = logic.board
+    saved_revealed = board.revealed.copy()
+    saved_count = logic.revealed_safe_cells
+
+    def restore():
+        board.revealed[:] = saved_revealed
+        logic.revealed_safe_cells = saved_count
+
+    rng = np.random.default_rng(seed)
+    hidden_safe = np.flatnonzero(~board.mines & ~board.revealed & (board.adjacent > 0))
+    numbered_cell = divmod(int(rng.choice(hidden_safe)), size) if len(hidden_safe) else (center, center)
+    timings['reveal_cell'] = measure(lambda: logic.reveal_cell(*numbered_cell), repeats, restore)
+
+    # open the largest empty region so the cascade is as big as the board allows
+    region_sizes = np.diff(board.region_offsets)
+    empty_cell = (center, center)
+    if len(region_sizes):
+        largest = int(np.argmax(region_sizes))
+        empty_cell = divmod(int(np.flatnonzero(board.region_labels.ravel() == largest)[0]), size)
+    timings['clear_adjacent_cells'] = measure(lambda: logic.clear_adjacent_cells(*empty_cell), repeats, restore)
+
+    restore()
+    timings['count_current_score'] = measure(logic.count_current_score, repeats)
+    timings['check_for_win'] = measure(logic.check_for_win, repeats)
+
+    return {'board': name, 'size': size, 'mines': mines, 'timings': timings,
+            'peak_memory_bytes': peak_board_memory(size, mines, seed)}
+
+def run_benchmarks(sizes, repeats, include_difficulties=True, seed=0) -> dict:
+    boards = []
+    if include_difficulties:
+        boards += [(name, settings['size'], settings['mines']) for name, settings in config.DIFFICULTIES.items()]
+    boards += [(f"{size}x{size}", size, int(size * size * SYNTHETIC_DENSITY)) for size in sizes]
+
+    results = []
+    for name, size, mines in boards:
+        result = benchmark_board(name, size, mines, repeats, seed)
+        results.append(result)
+        print(format_result(result))
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'created': time.time(), 'results': results}
+
+def format_result(result) -> str:
+    timings = '  '.join(f"{operation}: {1000 * result['timings'][operation]['median']:.3f}ms"
+                        for operation in OPERATIONS)
+    return f"{result['board']:>12}  peak: {result['peak_memory_bytes'] / 2 ** 20:.1f}MiB  {timings}"
+
+def compare(current, previous) -> list:
+    """ lines describing how each median changed against a previous run """
+    previous_boards = {result['board']: result for result in previous['results']}
+    lines = []
+    for result in current['results']:
+        before = previous_boards.get(result['board'])
+        if before is None:
+            continue
+        for operation in OPERATIONS:
+            old = before['timings'][operation]['median']
+            new = result['timings'][operation]['median']
+            ratio = new / old if old else float('inf')
+            flag = '  REGRESSION' if ratio > REGRESSION_RATIO and new - old > REGRESSION_FLOOR else ''
+            lines.append(f"{result['board']:>12}  {operation:<22} {1000 * old:9.3f}ms -> {1000 * new:9.3f}ms  x{ratio:.2f}{flag}")
+        old_memory = before['peak_memory_bytes']
+        new_memory = result['peak_memory_bytes']
+        lines.append(f"{result['board']:>12}  {'peak memory':<22} {old_memory / 2 ** 20:9.1f}MiB -> {new_memory / 2 ** 20:9.1f}MiB")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MinesweeperLogic hot paths across board sizes")
+    parser.add_argument('--sizes', type=int, nargs='*', default=SYNTHETIC_SIZES, help="synthetic square board sizes")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-difficulties', action='store_true', help="only run the synthetic sizes")
+    parser.add_argument('--output', default=None, help="write the results as json to this file")
+    parser.add_argument('--compare', default=None, help="json results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeats, not args.skip_difficulties, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+        print('\n'.join(compare(results, previous)))
+
+
+if __name__ == "__main__":
+    main()
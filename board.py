@@ -0,0 +1,312 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from cell import CellView
+
+NEIGHBOR_OFFSETS = \
+    [(-1, -1), (-1, 0), (-1, 1),
+     (0, -1),           (0, 1),
+     (1, -1), (1, 0), (1, 1)]
+
+def count_neighbors(mask) -> np.ndarray:
+    """ count the set neighbors of every cell over the last two axes of a boolean mask """
+    rows, columns = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad).astype(np.int8)
+    counts = np.zeros(mask.shape, dtype=np.int8)
+    for row_offset, col_offset in NEIGHBOR_OFFSETS:
+        counts += padded[..., 1 + row_offset:1 + row_offset + rows,
+                         1 + col_offset:1 + col_offset + columns]
+    return counts
+
+def dilate(mask) -> np.ndarray:
+    """ grow a boolean mask by one cell in all eight directions over its last two axes """
+    rows, columns = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad)
+    grown = mask.copy()
+    for row_offset, col_offset in NEIGHBOR_OFFSETS:
+        grown |= padded[..., 1 + row_offset:1 + row_offset + rows,
+                        1 + col_offset:1 + col_offset + columns]
+    return grown
+
+# cell codes used by snapshots and pattern keys, one nibble per cell; 0-8 are revealed numbers
+HIDDEN_CODE = 9
+FLAG_CODE = 10
+OUTSIDE_CODE = 11
+MINE_CODE = 12
+SAFE_CODE = 13
+
+def pack_codes(codes) -> bytes:
+    """ pack an array of cell codes two to a byte """
+    flat = np.asarray(codes, dtype=np.uint8).ravel()
+    if len(flat) % 2:
+        flat = np.append(flat, np.uint8(0))
+    return ((flat[0::2] << 4) | flat[1::2]).tobytes()
+
+def unpack_codes(key, count) -> np.ndarray:
+    packed = np.frombuffer(key, dtype=np.uint8)
+    codes = np.empty(2 * len(packed), dtype=np.uint8)
+    codes[0::2] = packed >> 4
+    codes[1::2] = packed & 0x0f
+    return codes[:count]
+
+def window_codes(padded, row, column, radius) -> np.ndarray:
+    """ the square of codes within radius of a cell, from codes padded by radius with OUTSIDE_CODE """
+    return padded[row:row + 2 * radius + 1, column:column + 2 * radius + 1]
+
+def label_regions(mask) -> tuple:
+    """ label the 8-connected regions of a 2D boolean mask
+
+    Returns (labels, count) where labels holds a region index per cell, or -1
+    outside the mask. Only the cells of the mask take part: neighboring cells
+    of the mask are linked and merged with a vectorized union-find, one link
+    direction at a time so only that direction's links are ever held. Each pass
+    hooks the larger root of every link onto the smaller one and then
+    compresses paths until every cell points at its root. Indices are int32,
+    which keeps the peak memory of labelling a large board to a few bytes per cell.
+    """
+    rows, columns = mask.shape
+    cells = np.flatnonzero(mask)
+    labels = np.full(mask.shape, -1, dtype=np.int32)
+    parent = np.arange(len(cells), dtype=np.int32)
+    labels.ravel()[cells] = parent
+
+    # links to the east, south-west, south and south-east cover every 8-connected pair once
+    for row_offset, col_offset in [(0, 1), (1, -1), (1, 0), (1, 1)]:
+        row_slice = slice(0, rows - row_offset)
+        col_slice = slice(max(0, -col_offset), columns - max(0, col_offset))
+        shifted_rows = slice(row_offset, rows)
+        shifted_cols = slice(max(0, -col_offset) + col_offset, columns - max(0, col_offset) + col_offset)
+        linked = mask[row_slice, col_slice] & mask[shifted_rows, shifted_cols]
+        sources = labels[row_slice, col_slice][linked]
+        targets = labels[shifted_rows, shifted_cols][linked]
+        del linked
+
+        # links merged by an earlier direction stay merged, since only roots are ever re-hooked
+        while True:
+            source_roots = parent[sources]
+            target_roots = parent[targets]
+            unmerged = source_roots != target_roots
+            if not unmerged.any():
+                break
+            sources, targets = sources[unmerged], targets[unmerged]
+            source_roots, target_roots = source_roots[unmerged], target_roots[unmerged]
+            np.minimum.at(parent, np.maximum(source_roots, target_roots), np.minimum(source_roots, target_roots))
+
+            while True:
+                jumped = parent[parent]
+                if np.array_equal(jumped, parent):
+                    break
+                parent = jumped
+
+    # number the roots in order, then give every cell its root's number
+    is_root = parent == np.arange(len(parent), dtype=np.int32)
+    root_number = np.cumsum(is_root, dtype=np.int32) - 1
+    labels.ravel()[cells] = root_number[parent]
+    return labels, int(np.count_nonzero(is_root))
+
+
+class ArrayBoard:
+    """ board state stored as parallel numpy arrays instead of a grid of Cell objects """
+
+    NEIGHBOR_OFFSETS = NEIGHBOR_OFFSETS
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.shape = (rows, columns)
+
+        self.mines = np.zeros(self.shape, dtype=bool)
+        self.revealed = np.zeros(self.shape, dtype=bool)
+        self.flagged = np.zeros(self.shape, dtype=bool)
+        self.adjacent = np.zeros(self.shape, dtype=np.int8)
+
+        # numbers are only meaningful once the mines have been placed
+        self.filled = False
+
+        # empty regions and their numbered borders, stored as a CSR style lookup
+        self.region_labels = None
+        self.region_offsets = None
+        self.region_cells = None
+
+    def reset(self) -> None:
+        """ clear the board for a new game of the same size, keeping its arrays """
+        self.mines.fill(False)
+        self.revealed.fill(False)
+        self.flagged.fill(False)
+        self.adjacent.fill(0)
+        self.filled = False
+        self.region_labels = None
+        self.region_offsets = None
+        self.region_cells = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row) -> "BoardRow":
+        if not 0 <= row < self.rows:
+            raise IndexError("board row out of range")
+        return BoardRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield BoardRow(self, row)
+
+    def cell(self, row, column) -> CellView:
+        return CellView(self, row, column)
+
+    def in_bounds(self, row, column) -> bool:
+        return 0 <= row < self.rows and 0 <= column < self.columns
+
+    def neighbor_window(self, row, column) -> tuple:
+        """ slices covering the 3x3 window around a cell, clipped to the board """
+        return (slice(max(row - 1, 0), min(row + 2, self.rows)),
+                slice(max(column - 1, 0), min(column + 2, self.columns)))
+
+    def count_adjacent_mines(self, row, column) -> int:
+        window = self.mines[self.neighbor_window(row, column)]
+        return int(window.sum()) - int(self.mines[row, column])
+
+    def place_random_mines(self, num_mines, rng, safe_row, safe_column, safe_neighborhood=False) -> None:
+        """ sample exactly num_mines distinct cells, never the safe cell (or its 3x3 area)
+
+        Positions are drawn without replacement from the cells that remain once
+        the safe ones are taken out, so the cost does not depend on mine density.
+        If the 3x3 area leaves too few cells, only the clicked cell is kept safe.
+        """
+        cells = self.rows * self.columns
+        excluded = np.array([safe_row * self.columns + safe_column])
+        if safe_neighborhood:
+            row_slice, col_slice = self.neighbor_window(safe_row, safe_column)
+            window = np.add.outer(np.arange(row_slice.start, row_slice.stop) * self.columns,
+                                  np.arange(col_slice.start, col_slice.stop)).ravel()
+            if cells - len(window) >= num_mines:
+                excluded = window
+        if cells - len(excluded) < num_mines:
+            raise ValueError(f"cannot place {num_mines} mines on a board with {cells} cells")
+
+        picks = rng.choice(cells - len(excluded), size=num_mines, replace=False)
+        # shift the picks past each excluded cell so they land on the remaining cells
+        for skipped in np.sort(excluded):
+            picks[picks >= skipped] += 1
+
+        self.mines[:] = False
+        self.mines.ravel()[picks] = True
+
+    def compute_adjacent(self) -> None:
+        """ count the mines around every cell in a single vectorized pass """
+        self.adjacent = count_neighbors(self.mines)
+        self.filled = True
+
+    def label_empty_regions(self) -> None:
+        """ precompute which cells open together when any empty cell of a region is revealed """
+        empty = (self.adjacent == 0) & ~self.mines
+        self.region_labels, count = label_regions(empty)
+
+        # a region opens every cell whose 3x3 window holds one of its empty cells, which
+        # covers the region itself plus the numbered border around it. The (region, cell)
+        # pairs are collected one window offset at a time from views of the padded labels,
+        # skipping labels an earlier offset already paired with the same cell, so nothing
+        # of size 9 x rows x columns is ever built. Each pair is one int64 key, region in
+        # the high word and cell in the low word, so one in-place sort groups the regions
+        padded = np.pad(self.region_labels, 1, constant_values=-1)
+        shifted = [padded[1 + row_offset:1 + row_offset + self.rows, 1 + col_offset:1 + col_offset + self.columns]
+                   for row_offset, col_offset in [(0, 0)] + NEIGHBOR_OFFSETS]
+        keys = []
+        for offset, labels in enumerate(shifted):
+            new = labels >= 0
+            for earlier in shifted[:offset]:
+                new &= labels != earlier
+            keys.append((labels[new].astype(np.int64) << 32) | np.flatnonzero(new))
+        del shifted, padded, labels, new
+        keys = np.concatenate(keys)
+        keys.sort()
+
+        self.region_offsets = np.searchsorted(keys, np.arange(count + 1, dtype=np.int64) << 32)
+        np.bitwise_and(keys, 0xFFFFFFFF, out=keys)
+        self.region_cells = keys.astype(np.int32)
+
+    def region_of(self, row, column) -> np.ndarray:
+        """ flat indices of every cell opened by revealing an empty cell """
+        label = self.region_labels[row, column]
+        if label < 0:
+            return np.empty(0, dtype=np.int32)
+        return self.region_cells[self.region_offsets[label]:self.region_offsets[label + 1]]
+
+    def open_cell(self, row, column) -> np.ndarray:
+        """ reveal a cell and, when it is empty, the whole region it opens; returns the newly revealed flat indices """
+        cells = self.region_of(row, column)
+        if not len(cells):
+            cells = np.array([row * self.columns + column])
+        revealed = self.revealed.ravel()
+        newly_revealed = cells[~revealed[cells]]
+        revealed[newly_revealed] = True
+        return newly_revealed
+
+    def observed_copy(self) -> "ArrayBoard":
+        """ copy of what a player can see: revealed numbers and flags, with hidden cells blanked """
+        copy = ArrayBoard(self.rows, self.columns)
+        copy.revealed = self.revealed.copy()
+        copy.flagged = self.flagged.copy()
+        copy.mines = self.mines & self.revealed
+        copy.adjacent = np.where(self.revealed, self.adjacent, 0).astype(np.int8)
+        copy.filled = self.filled
+        return copy
+
+    def observed_codes(self) -> np.ndarray:
+        """ what a player can see as one code per cell: numbers, hidden, flagged or a revealed mine """
+        codes = np.where(self.revealed, self.adjacent, HIDDEN_CODE).astype(np.uint8)
+        codes[self.flagged & ~self.revealed] = FLAG_CODE
+        codes[self.revealed & self.mines] = MINE_CODE
+        return codes
+
+    def snapshot(self) -> "BoardSnapshot":
+        return BoardSnapshot(self.rows, self.columns, pack_codes(self.observed_codes()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.mines.nbytes + self.revealed.nbytes + self.flagged.nbytes + self.adjacent.nbytes
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """ immutable, hashable copy of the observable state of a board
+
+    The observed codes are packed into bytes, so equal positions compare and
+    hash equal and a snapshot can key a dict or a TranspositionTable directly.
+    """
+    rows: int
+    columns: int
+    key: bytes
+
+    def codes(self) -> np.ndarray:
+        codes = unpack_codes(self.key, self.rows * self.columns).reshape(self.rows, self.columns)
+        codes.flags.writeable = False
+        return codes
+
+    def window_key(self, row, column, radius=2) -> bytes:
+        """ packed codes of the square around a cell, the key of a local pattern """
+        padded = np.pad(self.codes(), radius, constant_values=OUTSIDE_CODE)
+        return pack_codes(window_codes(padded, row, column, radius))
+
+
+class BoardRow:
+    """ lets callers keep indexing the board as board[row][column] """
+
+    def __init__(self, board, row):
+        self.board = board
+        self.row = row
+
+    def __len__(self) -> int:
+        return self.board.columns
+
+    def __getitem__(self, column) -> CellView:
+        if not 0 <= column < self.board.columns:
+            raise IndexError("board column out of range")
+        return CellView(self.board, self.row, column)
+
+    def __iter__(self):
+        for column in range(self.board.columns):
+            yield CellView(self.board, self.row, column)
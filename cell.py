@@ -18,5 +18,61 @@ class Cell:
     
     def set_number(self, number):
         self.number = number
-    
 
+
+class CellView:
+    """ Cell-compatible view of a single position on an ArrayBoard """
+
+    __slots__ = ('board', 'row', 'column')
+
+    def __init__(self, board, row, column):
+        self.board = board
+        self.row = row
+        self.column = column
+
+    def __str__(self):
+        return f"\nNumber: {self.number} \n# Adjacent mines: {self.adjacent_mines}\nRevealed: {self.is_revealed}"
+
+    @property
+    def is_mine(self) -> bool:
+        return bool(self.board.mines[self.row, self.column])
+
+    @property
+    def is_revealed(self) -> bool:
+        return bool(self.board.revealed[self.row, self.column])
+
+    @is_revealed.setter
+    def is_revealed(self, value) -> None:
+        self.board.revealed[self.row, self.column] = value
+
+    @property
+    def is_flagged(self) -> bool:
+        return bool(self.board.flagged[self.row, self.column])
+
+    @is_flagged.setter
+    def is_flagged(self, value) -> None:
+        self.board.flagged[self.row, self.column] = value
+
+    @property
+    def adjacent_mines(self) -> int:
+        return int(self.board.adjacent[self.row, self.column])
+
+    @property
+    def is_blank(self) -> bool:
+        # cells stay blank until the board has been filled
+        return not self.board.filled
+
+    @property
+    def is_empty(self) -> bool:
+        return self.board.filled and not self.is_mine and self.adjacent_mines == 0
+
+    @property
+    def is_numbered(self) -> bool:
+        return self.board.filled and not self.is_mine and self.adjacent_mines > 0
+
+    @property
+    def number(self) -> int:
+        return self.adjacent_mines if self.is_numbered else -1
+
+    def get_number(self):
+        return self.number
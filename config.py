@@ -42,6 +42,31 @@ MINE_COLORMAP = \
 button_width = 30
 button_height = 30
 
+HIDDEN_CELL_COLOR = '#d9d9d9'
+GRID_LINE_COLOR = '#8c8c8c'
+
+# moves per second for the AI player, None plays as fast as the solver can go
+AI_MOVES_PER_SECOND = 10
+
+# folder every finished game is saved to as a replay file, None keeps replays in memory only
+REPLAY_FOLDER = None
+
+# keep the 3x3 area around the first click free of mines, so the first click always opens a region
+SAFE_FIRST_CLICK = True
+
+# deal only boards the solver can clear from the first click without guessing
+NO_GUESS = False
+NO_GUESS_POOL_SIZE = 16
+
+# time the click, logic and redraw hot paths; the trace is written to PROFILE_TRACE on exit when set
+PROFILE = False
+PROFILE_TRACE = None
+
+# what follows a finished game: 'summary' shows the win or loss screen, 'restart' starts the same
+# kind of game again and 'none' leaves the final board up; the board stays up END_OF_GAME_DELAY_MS first
+END_OF_GAME = 'summary'
+END_OF_GAME_DELAY_MS = 5000
+
 # welcome window size
 
 welc_width = 400
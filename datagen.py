@@ -0,0 +1,187 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import config
+from encoding import board_observation
+from probability import MineProbabilityEngine
+from selfplay import SolverPlayer, new_logic
+
+def game_samples(difficulty, seed, player, engine, safe_neighborhood=False):
+    """ yield (observation, safe, probability) for every position of one solver game
+
+    observation is what the player sees (HIDDEN for unrevealed cells), safe the
+    hidden cells without a mine and probability the exact mine probability of
+    every cell given the observation. The game is dealt with fill_board on the
+    first click and then played by the solver, so positions follow real play.
+    """
+    logic = new_logic(difficulty, seed, safe_neighborhood)
+    player.new_game()
+    center = logic.grid_size // 2
+    alive = not logic.open_cell(center, center).is_mine
+    while alive and not logic.check_for_win():
+        board = logic.board
+        probability = engine.probabilities(board, logic.num_mines, player.known_mines)
+        yield board_observation(board), ~board.mines & ~board.revealed, probability.astype(np.float32)
+
+        cells, _ = player.next_moves(board, logic.num_mines)
+        for row, column in cells:
+            if not board.revealed[row, column]:
+                alive = not logic.open_cell(row, column).is_mine
+                if not alive:
+                    break
+
+def slot_arrays(buffer, slots, batch_size, rows, columns) -> dict:
+    """ numpy views of every field of every slot in one shared memory block """
+    shape = (slots, batch_size, rows, columns)
+    cells = int(np.prod(shape))
+    return {
+        'observation': np.ndarray(shape, dtype=np.int8, buffer=buffer, offset=0),
+        'safe': np.ndarray(shape, dtype=bool, buffer=buffer, offset=cells),
+        'probability': np.ndarray(shape, dtype=np.float32, buffer=buffer, offset=2 * cells),
+    }
+
+def slot_bytes(slots, batch_size, rows, columns) -> int:
+    # int8 observation, bool safe mask and float32 probability per cell
+    return slots * batch_size * rows * columns * (1 + 1 + 4)
+
+def produce_batches(memory_name, slots, batch_size, difficulty, first_seed, seed_step,
+                    safe_neighborhood, free_slots, ready_slots, stop) -> None:
+    """ worker process: fill free slots with samples from an endless run of games """
+    size = config.DIFFICULTIES[difficulty]['size']
+    memory = shared_memory.SharedMemory(name=memory_name)
+    arrays = slot_arrays(memory.buf, slots, batch_size, size, size)
+    player = SolverPlayer()
+    engine = MineProbabilityEngine()
+
+    samples = (sample for seed in itertools.count(first_seed, seed_step)
+               for sample in game_samples(difficulty, seed, player, engine, safe_neighborhood))
+    try:
+        while not stop.is_set():
+            try:
+                slot = free_slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            for index, (observation, safe, probability) in zip(range(batch_size), samples):
+                arrays['observation'][slot, index] = observation
+                arrays['safe'][slot, index] = safe
+                arrays['probability'][slot, index] = probability
+            ready_slots.put(slot)
+    finally:
+        del arrays
+        memory.close()
+
+
+class TrainingDataStream:
+    """ endless stream of training batches generated by background worker processes
+
+    Batches live in a fixed ring of slots inside one shared memory block.
+    Workers take a free slot, fill it with batch_size samples and hand its index
+    back on a bounded queue; iterating copies a ready slot out and returns it to
+    the free queue. At most `prefetch` batches are ever buffered, so memory use
+    is fixed however many samples are consumed, and while workers keep up the
+    consumer finds a batch waiting. Worker w plays seeds first_seed + w,
+    first_seed + w + workers, ..., so for a fixed number of workers each
+    worker's sequence of batches is reproducible. The order in which batches
+    from different workers arrive depends on process scheduling and is not.
+    """
+
+    def __init__(self, difficulty='Expert', batch_size=256, workers=None, prefetch=4,
+                 first_seed=0, safe_neighborhood=False):
+        self.difficulty = difficulty
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count()
+        self.slots = max(prefetch, self.workers)
+        self.size = config.DIFFICULTIES[difficulty]['size']
+
+        self.memory = shared_memory.SharedMemory(
+            create=True, size=slot_bytes(self.slots, batch_size, self.size, self.size))
+        self.arrays = slot_arrays(self.memory.buf, self.slots, batch_size, self.size, self.size)
+
+        self.free_slots = multiprocessing.Queue(self.slots)
+        self.ready_slots = multiprocessing.Queue(self.slots)
+        for slot in range(self.slots):
+            self.free_slots.put(slot)
+        self.stop_event = multiprocessing.Event()
+
+        self.processes = [multiprocessing.Process(
+            target=produce_batches, daemon=True,
+            args=(self.memory.name, self.slots, batch_size, difficulty, first_seed + worker, self.workers,
+                  safe_neighborhood, self.free_slots, self.ready_slots, self.stop_event))
+            for worker in range(self.workers)]
+        for process in self.processes:
+            process.start()
+
+        self.batches = 0
+        # time the consumer spent blocked waiting for a batch
+        self.wait_seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        start = time.perf_counter()
+        while True:
+            try:
+                slot = self.ready_slots.get(timeout=0.5)
+                break
+            except queue.Empty:
+                self.check_workers()
+        self.wait_seconds += time.perf_counter() - start
+        batch = {name: array[slot].copy() for name, array in self.arrays.items()}
+        self.free_slots.put(slot)
+        self.batches += 1
+        return batch
+
+    def check_workers(self) -> None:
+        """ raise instead of waiting forever for a batch no worker is left to make """
+        if not self.processes:
+            raise RuntimeError("the training data stream is closed")
+        exit_codes = [process.exitcode for process in self.processes if not process.is_alive()]
+        if exit_codes:
+            raise RuntimeError(f"training data workers exited with codes {exit_codes}")
+
+    def __enter__(self) -> "TrainingDataStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.arrays = {}
+        self.memory.close()
+        self.memory.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the throughput of the training data stream")
+    parser.add_argument('--difficulty', choices=list(config.DIFFICULTIES.keys()), default='Expert')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--prefetch', type=int, default=4)
+    args = parser.parse_args()
+
+    with TrainingDataStream(args.difficulty, args.batch_size, args.workers, args.prefetch) as stream:
+        start = time.perf_counter()
+        for _, batch in zip(range(args.batches), stream):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"batches: {stream.batches}  samples/s: {stream.batches * args.batch_size / elapsed:.0f}  "
+              f"waiting: {stream.wait_seconds:.2f}s of {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from records import HIDDEN
+
+# channel layout of an encoded observation
+REVEALED_CHANNEL = 0
+NUMBER_CHANNELS = slice(1, 10)      # one-hot mine counts 0-8, set on revealed cells only
+FLAG_CHANNEL = 10
+HIDDEN_CHANNEL = 11
+NUM_CHANNELS = 12
+
+def encode_observation(observation, flagged=None) -> np.ndarray:
+    """ turn observations into float32 network input of shape (..., NUM_CHANNELS, rows, columns)
+
+    observation holds the mine count of every revealed cell and HIDDEN for the
+    rest, the convention shared by MinesweeperEnv and the record reader. Any
+    number of leading batch axes is kept, and every channel is built with one
+    broadcast comparison over the whole batch.
+    """
+    observation = np.asarray(observation)
+    revealed = observation != HIDDEN
+    encoded = np.zeros(observation.shape[:-2] + (NUM_CHANNELS,) + observation.shape[-2:], dtype=np.float32)
+
+    encoded[..., REVEALED_CHANNEL, :, :] = revealed
+    numbers = np.arange(9, dtype=observation.dtype).reshape(9, 1, 1)
+    encoded[..., NUMBER_CHANNELS, :, :] = observation[..., None, :, :] == numbers
+    if flagged is not None:
+        encoded[..., FLAG_CHANNEL, :, :] = np.asarray(flagged, dtype=bool) & ~revealed
+    encoded[..., HIDDEN_CHANNEL, :, :] = ~revealed
+    return encoded
+
+def board_observation(board) -> np.ndarray:
+    """ the observation of an ArrayBoard, as a player sees it """
+    return np.where(board.revealed, board.adjacent, np.int8(HIDDEN))
+
+def encode_board(board) -> np.ndarray:
+    """ encode one ArrayBoard (a MinesweeperLogic board) to (NUM_CHANNELS, rows, columns) """
+    return encode_observation(board_observation(board), board.flagged)
+
+def encode_boards(boards) -> np.ndarray:
+    """ encode several boards of the same size into one (N, NUM_CHANNELS, rows, columns) batch """
+    observations = np.stack([board_observation(board) for board in boards])
+    flagged = np.stack([board.flagged for board in boards])
+    return encode_observation(observations, flagged)
@@ -0,0 +1,144 @@
+import numpy as np
+
+import config
+from board import count_neighbors, dilate
+
+class MinesweeperEnv:
+    """ GUI-free environment that steps many independent boards at once
+
+    Boards follow the rules in logic.py: mines are placed on the first reveal of
+    each game so the first click is always safe, empty cells open their whole
+    connected region, and a game is won once every safe cell is revealed.
+    Actions are flat cell indices (row * size + column), one per board.
+    """
+
+    HIDDEN = -1
+
+    REWARD_WIN = 1.0
+    REWARD_LOSS = -1.0
+    REWARD_PROGRESS = 0.3
+    REWARD_NO_PROGRESS = -0.3
+
+    def __init__(self, num_envs, size, mines, seed=None, autoreset=True):
+        if mines >= size * size:
+            raise ValueError("board needs at least one safe cell")
+        self.num_envs = num_envs
+        self.size = size
+        self.num_mines = mines
+        self.autoreset = autoreset
+
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_envs, size, size)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.adjacent = np.zeros(shape, dtype=np.int8)
+
+        self.num_moves = np.zeros(num_envs, dtype=np.int32)
+        self.safe_revealed = np.zeros(num_envs, dtype=np.int32)
+        self.done = np.zeros(num_envs, dtype=bool)
+
+    @classmethod
+    def from_difficulty(cls, difficulty, num_envs, seed=None, autoreset=True) -> "MinesweeperEnv":
+        settings = config.DIFFICULTIES[difficulty]
+        return cls(num_envs, settings['size'], settings['mines'], seed=seed, autoreset=autoreset)
+
+    @property
+    def num_safe_cells(self) -> int:
+        return self.size * self.size - self.num_mines
+
+    def reset(self, indices=None) -> np.ndarray:
+        """ start new games on the given boards (all boards by default) and return the observations """
+        if indices is None:
+            indices = np.arange(self.num_envs)
+        self.mines[indices] = False
+        self.revealed[indices] = False
+        self.adjacent[indices] = 0
+        self.num_moves[indices] = 0
+        self.safe_revealed[indices] = 0
+        self.done[indices] = False
+        return self.observation()
+
+    def observation(self) -> np.ndarray:
+        """ int8 tensor of shape (num_envs, size, size): HIDDEN for unrevealed cells, else the mine count """
+        return np.where(self.revealed, self.adjacent, np.int8(self.HIDDEN))
+
+    def step(self, actions) -> tuple:
+        """ reveal one cell on every board
+
+        Returns (observations, rewards, dones, info). Finished boards are reset
+        automatically when autoreset is on, so the returned observation for a
+        finished board is the first observation of its next game; info['won']
+        tells wins apart from losses.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"expected {self.num_envs} actions, got shape {actions.shape}")
+
+        boards = np.arange(self.num_envs)
+        rows, columns = np.divmod(actions, self.size)
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        won = np.zeros(self.num_envs, dtype=bool)
+        active = ~self.done
+
+        first_moves = active & (self.num_moves == 0)
+        if first_moves.any():
+            self._place_mines(boards[first_moves], actions[first_moves])
+
+        already_revealed = self.revealed[boards, rows, columns]
+        hit_mine = active & self.mines[boards, rows, columns]
+        opening = active & ~already_revealed & ~hit_mine
+
+        rewards[active & already_revealed] = self.REWARD_NO_PROGRESS
+        rewards[hit_mine] = self.REWARD_LOSS
+        self.revealed[boards[hit_mine], rows[hit_mine], columns[hit_mine]] = True
+
+        if opening.any():
+            self._open_cells(boards[opening], rows[opening], columns[opening])
+            rewards[opening] = self.REWARD_PROGRESS
+            won = opening & (self.safe_revealed == self.num_safe_cells)
+            rewards[won] = self.REWARD_WIN
+
+        self.num_moves[active] += 1
+        dones = hit_mine | won
+        self.done |= dones
+
+        if self.autoreset and dones.any():
+            self.reset(boards[dones])
+
+        return self.observation(), rewards, dones, {'won': won}
+
+    def _place_mines(self, boards, actions) -> None:
+        """ sample exactly num_mines cells per board, never the first clicked cell """
+        cells = self.size * self.size
+        keys = self.rng.random((len(boards), cells))
+        keys[np.arange(len(boards)), actions] = np.inf
+        chosen = np.argpartition(keys, self.num_mines - 1, axis=1)[:, :self.num_mines]
+
+        mines = np.zeros((len(boards), cells), dtype=bool)
+        np.put_along_axis(mines, chosen, True, axis=1)
+        mines = mines.reshape(len(boards), self.size, self.size)
+
+        self.mines[boards] = mines
+        self.adjacent[boards] = count_neighbors(mines)
+
+    def _open_cells(self, boards, rows, columns) -> None:
+        """ reveal the clicked cells and flood-fill every clicked empty cell at once """
+        opened = np.zeros((len(boards), self.size, self.size), dtype=bool)
+        opened[np.arange(len(boards)), rows, columns] = True
+
+        empty = (self.adjacent[boards] == 0) & ~self.mines[boards]
+        region = opened & empty
+        if region.any():
+            # grow every empty region together until none of them changes
+            while True:
+                grown = dilate(region) & empty
+                if np.array_equal(grown, region):
+                    break
+                region = grown
+            opened |= dilate(region)
+
+        newly_opened = opened & ~self.revealed[boards]
+        self.revealed[boards] |= opened
+        self.safe_revealed[boards] += newly_opened.sum(axis=(1, 2), dtype=np.int32)
@@ -1,37 +1,91 @@
+import time
 import tkinter as tk
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable
 
-from gui import MinesweeperGUI
 import config
-from game_over import EndSplashScreen
-from winner import WinSplashScreen
 from welcome import WelcomeScreen
 from logic import MinesweeperLogic
+from replay import GameLog
+
+# the game board, splash screens, AI player, no-guess pool and profiler are
+# imported the first time they are used so the welcome screen comes up quickly
+
+@dataclass
+class GameOutcome:
+    difficulty: str
+    player: str
+    won: bool
+    score: int
+    moves: int
+    seconds: float
+
 
 class GameManager:
     
-    def __init__(self, restart_function) -> None:
-        self.restart_function = restart_function
-        
+    def __init__(self) -> None:
         self.root = tk.Tk()
         self.root.title("Minesweeper")
+        # the splash screens recolor the window; a restart puts this back
+        self.background = self.root.cget('bg')
         
         self.logic = MinesweeperLogic(self)
-        self.GUI = MinesweeperGUI(self.root, self)
-
-        self.win_screen = WinSplashScreen(self.restart_game, self.destroy_game)
-        self.end_screen = EndSplashScreen(self.restart_game, self.destroy_game)
+        # built on first use
+        self.GUI = None
+        self.win_screen = None
+        self.end_screen = None
         
         self.show_welcome_screen = WelcomeScreen()
 
+        self.autoplayer = None
+        # the last game started, so the same kind of game can be played again
+        self.difficulty = None
+        self.player = None
+        self.started_at = None
+
+        # called with a GameOutcome as each game ends, before any end screen is shown
+        self.result_listeners = []
+        # the after() job that moves on from a finished game
+        self.end_job = None
+        # one pool of guess-free boards per difficulty, started the first time it is needed
+        self.no_guess_pools = {}
+
+        self.profiler = None
+        if config.PROFILE:
+            self.enable_profiling()
+
+    def enable_profiling(self):
+        """ start timing the hot paths of this game; returns the instrumentation.Profiler holding the stats """
+        from instrumentation import Profiler, instrument_game
+        if self.profiler is None:
+            self.profiler = Profiler()
+            instrument_game(self.profiler, self)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        if self.profiler is not None:
+            self.profiler.uninstrument()
+            self.profiler = None
+
+    def profiling_stats(self) -> dict:
+        return self.profiler.snapshot() if self.profiler else {}
+
     def start_welcome_screen(self) -> None:
         self.show_welcome_screen.show_welcome_screen(self.root, self.start_game)
         self.root.mainloop()
 
     def start_game(self, difficulty, player) -> None:
+        self.difficulty = difficulty
+        self.player = player
         self.clear_screen()
         
         self.create_game_board(difficulty, player)
+
+        if player == 'AI':
+            from autoplay import AutoPlayer
+            self.autoplayer = AutoPlayer(self)
+            self.autoplayer.start()
         
         self.current_screen = self.GUI
         self.GUI = self.current_screen
@@ -40,66 +94,161 @@ class GameManager:
         self.logic.player = player
         self.logic.set_difficulty(config.DIFFICULTIES[difficulty]['size']) 
         self.logic.set_mines(config.DIFFICULTIES[difficulty]['mines'])
+        self.logic.set_safe_neighborhood(config.SAFE_FIRST_CLICK)
+        self.logic.set_mine_source(self.no_guess_pool(difficulty).take if config.NO_GUESS else None)
         self.logic.create_board()
+        self.started_at = time.perf_counter()
+        GameLog.start(self.logic)
+        self.build_gui()
         self.GUI.main_gui_setup(self.logic.grid_size)
     
+    def build_gui(self) -> None:
+        if self.GUI is not None:
+            return
+        from gui import MinesweeperGUI
+        self.GUI = MinesweeperGUI(self.root, self)
+        if self.profiler is not None:
+            from instrumentation import instrument_gui
+            instrument_gui(self.profiler, self.GUI)
+
+    def no_guess_pool(self, difficulty):
+        from noguess import NoGuessPool
+        if difficulty not in self.no_guess_pools:
+            self.no_guess_pools[difficulty] = NoGuessPool.from_difficulty(difficulty, size=config.NO_GUESS_POOL_SIZE)
+        return self.no_guess_pools[difficulty]
+
+    def add_result_listener(self, listener) -> None:
+        self.result_listeners.append(listener)
+
+    def end_game(self, won) -> None:
+        """ report the result, then do what config.END_OF_GAME says once the delay has passed
+
+        Nothing here blocks: the next screen or game is started by an after()
+        job, so the event loop keeps running and batch runs never wait on a window.
+        """
+        self.logic.running = False
+        self.save_replay()
+        outcome = GameOutcome(self.difficulty, self.player, won, self.logic.get_score(),
+                              self.logic.num_moves, time.perf_counter() - self.started_at)
+        for listener in list(self.result_listeners):
+            listener(outcome)
+
+        if config.END_OF_GAME == 'summary':
+            next_step = self.show_win_screen if won else self.show_loss_screen
+        elif config.END_OF_GAME == 'restart':
+            next_step = self.play_again
+        else:
+            return
+        self.end_job = self.root.after(config.END_OF_GAME_DELAY_MS, lambda: self.finish_game(next_step))
+
+    def finish_game(self, next_step) -> None:
+        self.end_job = None
+        next_step()
+
     def show_win_screen(self) -> None:
         """ clear the gui and show the winner splash screen """
         self.clear_screen()
+        if self.win_screen is None:
+            from winner import WinSplashScreen
+            self.win_screen = WinSplashScreen(self.restart_game, self.destroy_game)
         self.win_screen.show_win_screen(self.root)
     
     def show_loss_screen(self) -> None:
         self.clear_screen()
+        if self.end_screen is None:
+            from game_over import EndSplashScreen
+            self.end_screen = EndSplashScreen(self.restart_game, self.destroy_game)
         self.end_screen.show_end_screen(self.root)
 
     def clear_screen(self) -> None:
+        """ remove the current screen, keeping the game board widgets hidden for the next game """
+        self.stop_autoplay()
+        if self.end_job is not None:
+            self.root.after_cancel(self.end_job)
+            self.end_job = None
+        self.root.configure(bg=self.background)
+        board_frame = None
+        if self.GUI is not None:
+            self.GUI.hide()
+            board_frame = self.GUI.frame
         for widget in self.root.winfo_children():
-            widget.destroy()
+            if widget is not board_frame:
+                widget.destroy()
+
+    def stop_autoplay(self) -> None:
+        if self.autoplayer:
+            self.autoplayer.stop()
+            self.autoplayer = None
 
     def restart_game(self) -> None:
-        self.destroy_game()
-        self.restart_function()             # we need to change this to destroy the game manager and 
-        
+        """ go back to the welcome screen in the same window; the root, board and canvas are reused """
+        self.clear_screen()
+        self.show_welcome_screen.show_welcome_screen(self.root, self.start_game)
+
+    def play_again(self) -> None:
+        """ start another game with the last difficulty and player straight away """
+        self.start_game(self.difficulty, self.player)
+
     def destroy_game(self) -> None:
         self.clear_screen()
+        for pool in self.no_guess_pools.values():
+            pool.close()
+        self.no_guess_pools = {}
+        if self.profiler is not None and config.PROFILE_TRACE:
+            self.profiler.export_trace(config.PROFILE_TRACE)
         self.root.destroy()
 
+    def save_replay(self) -> None:
+        """ write the finished game to config.REPLAY_FOLDER when one is set """
+        game_log = self.logic.game_log
+        if config.REPLAY_FOLDER is None or game_log is None:
+            return
+        folder = Path(config.REPLAY_FOLDER)
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        path = folder / f"replay_{stamp}.npz"
+        # games can finish within the same second, so later ones get a numbered name
+        number = 1
+        while path.exists():
+            path = folder / f"replay_{stamp}_{number}.npz"
+            number += 1
+        game_log.save(path)
+
     def on_left_click(self, row, column) -> Callable:
         def callback(event):
-            logic_row, logic_column  = row - 1, column  # row decremented by one because an extra row in the gui contains the timer and score labels
+            # a revealed cell or a finished game has nothing left to do
+            if not self.logic.running or self.logic.board.revealed[row, column]:
+                return
             
-            cell = self.logic.reveal_cell(logic_row, logic_column)
-            button = event.widget
+            cell = self.logic.reveal_cell(row, column)
 
-            self.GUI.configure_game_button_state(button, cell)
+            self.GUI.configure_cell_state(row, column, cell)
             
-            if self.logic.check_for_win():
-                self.root.after(5000, lambda: self.show_win_screen())
-            elif cell.is_empty:
-                to_reveal = self.logic.clear_adjacent_cells(logic_row, logic_column)
+            if cell.is_empty:
+                to_reveal = self.logic.clear_adjacent_cells(row, column)
                 self.GUI.clear_adjacent_cells(to_reveal)
             elif cell.is_mine:
-                self.logic.running = False
                 self.GUI.reveal_board()
-                self.root.after(5000, lambda: self.show_loss_screen())
+                self.end_game(won=False)
             elif cell.is_numbered:
-                self.GUI.configure_game_button_state(button, cell)
+                self.GUI.configure_cell_state(row, column, cell)
             else:
                 self.GUI.show_error("ERROR", "cell type not allowed")
                 self.root.after(10000, self.destroy_game)
+            # checked after any cascade, which can reveal the last safe cells
+            if self.logic.running and self.logic.check_for_win():
+                self.end_game(won=True)
             self.GUI.update_game_score()
         return callback
     
     def on_right_click(self, row, column) -> Callable:
         """ handles flagging of tiles """
         def callback(event):
-            logic_row, logic_column  = row - 1, column  # row decremented by one because an extra row in the gui contains the timer and score labels
-            button = event.widget
-            cell = self.logic.select_cell(logic_row, logic_column)
-            if button.cget('relief') == tk.SUNKEN:
+            cell = self.logic.select_cell(row, column)
+            if not self.logic.running or cell.is_revealed:
                 return callback 
             else:
-                action = self.logic.toggle_flag(logic_row, logic_column)
-                self.GUI.configure_game_button_state(button, cell, action)
+                action = self.logic.toggle_flag(row, column)
+                self.GUI.configure_cell_state(row, column, cell, action)
 
         return callback
\ No newline at end of file
@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 import time
 
+import numpy as np
+
+import assets
 import config
 
 class MinesweeperGUI:
@@ -12,48 +15,113 @@ class MinesweeperGUI:
         
             
                   
-        self.images = \
-        {
-            'mine': tk.PhotoImage(file=config.mine_image),
-            'flag': tk.PhotoImage(file=config.flag_image)
-        }
-        
-        self.flag_images = {}  
+        # image files by name, decoded through the shared cache the first time a cell needs one
+        self.image_files = {'mine': config.mine_image, 'flag': config.flag_image}
+
+        # cells changed since the last redraw, mapped to their flag action (or None)
+        self.dirty_cells = {}
+        self.redraw_scheduled = False
+        # canvas items drawn for each cell, so a redraw never searches the canvas by tag
+        self.cell_items = {}
+
+        # the frame, labels and canvas are built for the first game and reused by every later one
+        self.frame = None
+        self.canvas = None
+        self.grid_shape = None
+        self.clock_job = None
      
     def main_gui_setup(self, size) -> None:
         self.master.title("Minesweeper")
-        self.setup_game_clock(self.master, self.controller.logic.grid_size)
-        # create layout for the elements on the screen
-        for i in range(1, size + 1):
-            self.master.grid_rowconfigure(i, weight=1) 
-        for i in range(size):
-            self.master.grid_columnconfigure(i, weight=1)
-
-        self.buttons = [[self.create_button(self.master, row + 1, column) for column in range(size)] for row in range(size)]
+        if self.frame is None or not self.frame.winfo_exists():
+            self.frame = tk.Frame(self.master)
+            self.setup_game_clock(self.frame, self.controller.logic.grid_size)
+            self.canvas = None
+        self.frame.pack()
+        self.start_game_clock()
+
+        self.size = size
+        self.dirty_cells = {}
+        self.cell_items = {}
+        self.set_cell_size(size)
+        if self.canvas is None:
+            self.canvas = self.create_canvas(self.frame, size)
+        else:
+            self.reset_canvas(size)
 
         self.master.resizable(False, False)
-        
-        window_width = size * config.button_width
-        window_height = size * config.button_height
+        self.fit_window()
+
+    def fit_window(self, extra_height=0) -> None:
+        """ size and center the window around the board, the clock row and extra_height pixels of widgets below """
+        window_width = self.size * self.cell_width
+        window_height = self.size * self.cell_height + self.timer_label.winfo_reqheight() + extra_height
         
         self.master.minsize(window_width, window_height)
         
         self.set_window_center(window_width, window_height)     
 
-    def create_button(self, master, row, column) -> tk.Button:
-        frame = tk.Frame(master)
-        frame.grid(row=row, column=column, padx=0, pady=0, sticky="nsew")  # Use sticky to fill the space
-        
-        button = tk.Button(frame, width=config.button_width,height=config.button_height)
-        
-        if self.controller.logic.player != 'AI':
-            button.bind('<Button-1>', lambda event, r=row, c=column: self.controller.on_left_click(r, c)(event))
-            # right click bound to setting flags
-            button.bind('<Button-3>', lambda event, r=row, c=column: self.controller.on_right_click(r, c)(event))
-
-        button.pack(expand=True, fill='both')  # pack button to fill full frame
-
-        return button
+    def set_cell_size(self, size) -> None:
+        """ use the configured cell size, shrinking it when the board would not fit on screen """
+        fit_width = int(self.master.winfo_screenwidth() * 0.9) // size
+        fit_height = int(self.master.winfo_screenheight() * 0.8) // size
+        self.cell_width = max(min(config.button_width, fit_width), 1)
+        self.cell_height = max(min(config.button_height, fit_height), 1)
+
+    def create_canvas(self, master, size) -> tk.Canvas:
+        """ draw the whole board on one canvas; hidden cells are just the background and grid lines """
+        width, height = size * self.cell_width, size * self.cell_height
+        canvas = tk.Canvas(master, width=width, height=height, highlightthickness=0, bg=config.HIDDEN_CELL_COLOR)
+        canvas.grid(row=1, column=0, columnspan=2, sticky="nsew")
+        self.draw_grid(canvas, size)
+
+        # bound once for the life of the canvas; clicks are ignored while the AI is playing
+        canvas.bind('<Button-1>', lambda event: self.on_canvas_click(event, self.controller.on_left_click))
+        # right click bound to setting flags
+        canvas.bind('<Button-3>', lambda event: self.on_canvas_click(event, self.controller.on_right_click))
+
+        return canvas
+
+    def draw_grid(self, canvas, size) -> None:
+        width, height = size * self.cell_width, size * self.cell_height
+        canvas.delete('grid')
+        for row in range(size + 1):
+            canvas.create_line(0, row * self.cell_height, width, row * self.cell_height,
+                               fill=config.GRID_LINE_COLOR, tags='grid')
+        for column in range(size + 1):
+            canvas.create_line(column * self.cell_width, 0, column * self.cell_width, height,
+                               fill=config.GRID_LINE_COLOR, tags='grid')
+        self.grid_shape = (size, self.cell_width, self.cell_height)
+
+    def reset_canvas(self, size) -> None:
+        """ clear the last game off the canvas, redrawing the grid only when the board size changed """
+        self.canvas.delete('cell')
+        if self.grid_shape != (size, self.cell_width, self.cell_height):
+            self.canvas.config(width=size * self.cell_width, height=size * self.cell_height)
+            self.draw_grid(self.canvas, size)
+
+    def hide(self) -> None:
+        """ take the board off the window without destroying it, so the next game can reuse it """
+        self.stop_game_clock()
+        if self.frame is not None and self.frame.winfo_exists():
+            self.frame.pack_forget()
+
+    def cell_at(self, x, y) -> tuple:
+        """ map canvas coordinates to a (row, column) on the board, or None outside it """
+        row, column = int(y) // self.cell_height, int(x) // self.cell_width
+        if 0 <= row < self.size and 0 <= column < self.size:
+            return row, column
+        return None
+
+    def on_canvas_click(self, event, handler) -> None:
+        if self.controller.logic.player == 'AI':
+            return
+        position = self.cell_at(event.x, event.y)
+        if position is not None:
+            handler(*position)(event)
+
+    def cell_image(self, name) -> tk.PhotoImage:
+        """ the named image, subsampled when the cells are smaller than it """
+        return assets.images.fitted(self.master, self.image_files[name], self.cell_width, self.cell_height)
 
     def set_window_center(self, width, height) -> None:
         # Get screen width and height
@@ -66,38 +134,71 @@ class MinesweeperGUI:
         self.master.geometry(f'{width}x{height}+{int(x)}+{int(y)}')
     
     def reveal_board(self) -> None:
-        for row_index, row_entries in enumerate(self.controller.logic.board):
-            for col_index, cell in enumerate(row_entries):
-                self._update_button_if_not_revealed(row_index, col_index, cell)
-
-    def _update_button_if_not_revealed(self, row_index, col_index, cell) -> None:
-        if not cell.is_revealed:
-            button = self.buttons[row_index][col_index]
-            self.configure_game_button_state(button, cell)
-
-    def configure_game_button_state(self, button, cell, action = None) -> None:
+        board = self.controller.logic.board
+        for row_index, col_index in zip(*np.nonzero(~board.revealed)):
+            self.mark_dirty(int(row_index), int(col_index))
+
+    def redraw_board(self) -> None:
+        """ throw away every drawn cell and draw the current board from scratch """
+        self.canvas.delete('cell')
+        self.cell_items = {}
+        self.dirty_cells = {}
+        board = self.controller.logic.board
+        for row_index, col_index in zip(*np.nonzero(board.revealed)):
+            self.mark_dirty(int(row_index), int(col_index))
+        for row_index, col_index in zip(*np.nonzero(board.flagged & ~board.revealed)):
+            self.mark_dirty(int(row_index), int(col_index), 'setflag')
+
+    def configure_cell_state(self, row, column, cell, action = None) -> None:
+        """ queue a cell for the next redraw; the cell is read back from the logic when drawn """
+        self.mark_dirty(row, column, action)
+
+    def mark_dirty(self, row, column, action = None) -> None:
+        self.dirty_cells[(row, column)] = action
+        if not self.redraw_scheduled:
+            # every change made before Tk goes idle is drawn together in one pass
+            self.redraw_scheduled = True
+            self.master.after_idle(self.redraw_dirty_cells)
+
+    def redraw_dirty_cells(self) -> None:
+        self.redraw_scheduled = False
+        dirty, self.dirty_cells = self.dirty_cells, {}
+        board = self.controller.logic.board
+        for (row, column), action in dirty.items():
+            self.draw_cell(row, column, board.cell(row, column), action)
+
+    def draw_cell(self, row, column, cell, action = None) -> None:
+        items = self.cell_items.pop((row, column), None)
+        if items:
+            self.canvas.delete(*items)
+
+        x0, y0 = column * self.cell_width, row * self.cell_height
+        x1, y1 = x0 + self.cell_width, y0 + self.cell_height
+        center = ((x0 + x1) / 2, (y0 + y1) / 2)
+
+        items = []
         if action:
             if action == 'setflag':
-                button.config(image=self.images['flag'], width=config.button_width, height=config.button_height)
-            elif action == 'unset_flag':
-                button.config(relief=tk.RAISED, image='')
+                items.append(self.canvas.create_image(*center, image=self.cell_image('flag'), tags='cell'))
+            # unsetting a flag leaves the plain hidden background showing
         else:
             if cell.is_mine:
                 color = config.MINE_COLORMAP['mine']
-                button.config(relief=tk.RAISED, state=tk.DISABLED, bg=color, image=self.images['mine'])
+                items.append(self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline=config.GRID_LINE_COLOR, tags='cell'))
+                items.append(self.canvas.create_image(*center, image=self.cell_image('mine'), tags='cell'))
             elif cell.is_numbered:
                 color = config.MINE_COLORMAP.get(cell.get_number())
-                button.config(relief=tk.SUNKEN, state=tk.DISABLED,text=cell.get_number(), bg=color, fg='white')
+                items.append(self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline=config.GRID_LINE_COLOR, tags='cell'))
+                items.append(self.canvas.create_text(*center, text=cell.get_number(), fill='white', tags='cell'))
             elif cell.is_empty:
                 color = config.MINE_COLORMAP['empty']
-                button.config(relief=tk.SUNKEN, state=tk.DISABLED, text='', bg=color)
-            self.master.update()
+                items.append(self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline=config.GRID_LINE_COLOR, tags='cell'))
+        if items:
+            self.cell_items[(row, column)] = items
 
     def clear_adjacent_cells(self, to_reveal) -> None:
         for row, col in to_reveal:
-            button = self.buttons[row][col]
-            cell = self.controller.logic.board[row][col]
-            self.configure_game_button_state(button, cell)
+            self.mark_dirty(row, col)
 
     def load_image(self, master) -> None:
         # Get the appropriate icon file based on the OS used
@@ -106,25 +207,36 @@ class MinesweeperGUI:
         if icon_file.endswith('.ico'):
             master.iconbitmap(icon_file)
         else:
-            tt_img = tk.PhotoImage(file=icon_file)
+            tt_img = assets.images.get(master, icon_file)
             master.iconphoto(True, tt_img)
 
     def setup_game_clock(self, master, size) -> None:
         self.timer_label = tk.Label(master, text="Time: 0s")
-        self.timer_label.grid(row=0, column=0, columnspan=size//2, sticky="w")
+        self.timer_label.grid(row=0, column=0, sticky="w")
 
         self.score_label = tk.Label(master, text=f"Score: {self.controller.logic.get_score()}")
-        self.score_label.grid(row=0, column=size//2, columnspan=size//2, sticky="e")
+        self.score_label.grid(row=0, column=1, sticky="e")
+
+    def start_game_clock(self) -> None:
+        self.stop_game_clock()
+        self.timer_label.config(text="Time: 0s")
+        self.update_game_score()
         if not self.controller.logic.running:
             self.start_time = time.time()
             self.controller.logic.running = True
             self.update_game_clock()
 
+    def stop_game_clock(self) -> None:
+        if self.clock_job is not None:
+            self.master.after_cancel(self.clock_job)
+            self.clock_job = None
+
     def update_game_clock(self) -> None:
+        self.clock_job = None
         if self.controller.logic.running:
             elapsed_time = int(time.time() - self.start_time)
             self.timer_label.config(text=f"Time: {elapsed_time}s")
-            self.master.after(1000, self.update_game_clock)
+            self.clock_job = self.master.after(1000, self.update_game_clock)
     
     def update_game_score(self) -> None:
         self.score_label.config(text=f"Score: {self.controller.logic.get_score()}")
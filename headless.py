@@ -0,0 +1,86 @@
+import argparse
+
+import config
+from logic import MinesweeperLogic
+
+HELP = "commands: r <row> <column> to reveal, f <row> <column> to flag, q to quit"
+
+def render(logic) -> str:
+    """ the board as text: # hidden, F flagged, * mine, . empty, digits for numbers """
+    board = logic.board
+    lines = ['   ' + ''.join(f"{column % 10}" for column in range(board.columns))]
+    for row in range(board.rows):
+        symbols = []
+        for column in range(board.columns):
+            if not board.revealed[row, column]:
+                symbols.append('F' if board.flagged[row, column] else '#')
+            elif board.mines[row, column]:
+                symbols.append('*')
+            elif board.adjacent[row, column]:
+                symbols.append(str(board.adjacent[row, column]))
+            else:
+                symbols.append('.')
+        lines.append(f"{row:>2} " + ''.join(symbols))
+    return '\n'.join(lines)
+
+def new_game(difficulty, seed=None) -> MinesweeperLogic:
+    logic = MinesweeperLogic(None, seed=seed)
+    logic.set_difficulty(config.DIFFICULTIES[difficulty]['size'])
+    logic.set_mines(config.DIFFICULTIES[difficulty]['mines'])
+    logic.create_board()
+    logic.running = True
+    return logic
+
+def apply_command(logic, command) -> str:
+    """ run one text command against the game and return a message for the player """
+    parts = command.split()
+    if len(parts) != 3 or parts[0] not in ('r', 'f'):
+        return HELP
+    try:
+        row, column = int(parts[1]), int(parts[2])
+    except ValueError:
+        return HELP
+    if not (0 <= row < logic.grid_size and 0 <= column < logic.grid_size):
+        return "that cell is not on the board"
+
+    if parts[0] == 'f':
+        if logic.board.revealed[row, column]:
+            return "that cell is already revealed"
+        logic.toggle_flag(row, column)
+        return ''
+    if logic.board.revealed[row, column]:
+        return ''
+    logic.open_cell(row, column)
+    return ''
+
+def play(logic, read=input, write=print) -> bool:
+    """ play one game from text commands until it is won, lost or quit; returns whether it was won """
+    write(HELP)
+    while logic.running and not logic.check_for_win():
+        write(render(logic))
+        write(f"score: {logic.get_score()}")
+        try:
+            command = read("> ").strip()
+        except EOFError:
+            return False
+        if command == 'q':
+            return False
+        message = apply_command(logic, command)
+        if message:
+            write(message)
+
+    write(render(logic))
+    won = logic.check_for_win()
+    write("You won!" if won else "Game over")
+    return won
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Minesweeper in the terminal without tkinter")
+    parser.add_argument('--difficulty', choices=list(config.DIFFICULTIES.keys()), default='Beginner')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    play(new_game(args.difficulty, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from encoding import FLAG_CHANNEL, HIDDEN_CHANNEL, NUM_CHANNELS, encode_observation
+from environment import MinesweeperEnv
+
+def conv3x3(batch, weight, bias) -> np.ndarray:
+    """ same-padded 3x3 convolution of (N, in, rows, columns) with a (out, in, 3, 3) weight
+
+    The nine kernel taps are nine batched matrix products over the channels,
+    each on a shifted view of the padded input, so BLAS does all the work.
+    """
+    count, channels, rows, columns = batch.shape
+    padded = np.pad(batch, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    output = np.zeros((count, len(weight), rows * columns), dtype=np.float32)
+    for row_offset in range(3):
+        for col_offset in range(3):
+            shifted = padded[:, :, row_offset:row_offset + rows, col_offset:col_offset + columns]
+            output += weight[:, :, row_offset, col_offset] @ shifted.reshape(count, channels, rows * columns)
+    output += bias[:, None]
+    return output.reshape(count, len(weight), rows, columns)
+
+
+class ConvPolicy:
+    """ fully convolutional network mapping encoded boards to a mine logit per cell
+
+    Every layer is a 3x3 convolution followed by a ReLU, except the last one,
+    which has a single output channel. With no dense layers the same weights
+    work on any board size. The forward pass is plain numpy so inference runs
+    on the CPU without a deep learning framework.
+    """
+
+    def __init__(self, layers):
+        # list of (weight (out, in, 3, 3), bias (out,)) pairs
+        self.layers = [(np.asarray(weight, dtype=np.float32), np.asarray(bias, dtype=np.float32))
+                       for weight, bias in layers]
+
+    @classmethod
+    def random(cls, hidden_channels=(32, 32), seed=None) -> "ConvPolicy":
+        """ He-initialized weights, for testing the pipeline before a model has been trained """
+        rng = np.random.default_rng(seed)
+        sizes = [NUM_CHANNELS, *hidden_channels, 1]
+        layers = []
+        for inputs, outputs in zip(sizes[:-1], sizes[1:]):
+            weight = rng.normal(0, np.sqrt(2 / (9 * inputs)), (outputs, inputs, 3, 3))
+            layers.append((weight, np.zeros(outputs)))
+        return cls(layers)
+
+    @classmethod
+    def load(cls, path) -> "ConvPolicy":
+        with np.load(path) as weights:
+            return cls([(weights[f'weight_{index}'], weights[f'bias_{index}'])
+                        for index in range(len(weights.files) // 2)])
+
+    def save(self, path) -> None:
+        arrays = {}
+        for index, (weight, bias) in enumerate(self.layers):
+            arrays[f'weight_{index}'] = weight
+            arrays[f'bias_{index}'] = bias
+        with open(path, 'wb') as weights_file:
+            np.savez(weights_file, **arrays)
+
+    def __call__(self, batch) -> np.ndarray:
+        """ (N, NUM_CHANNELS, rows, columns) encoded boards -> (N, rows, columns) mine logits """
+        output = np.asarray(batch, dtype=np.float32)
+        for index, (weight, bias) in enumerate(self.layers):
+            output = conv3x3(output, weight, bias)
+            if index < len(self.layers) - 1:
+                np.maximum(output, 0, out=output)
+        return output[:, 0]
+
+
+def choose_actions(encoded, logits) -> np.ndarray:
+    """ flat index of the hidden, unflagged cell with the lowest mine logit on every board """
+    hidden = (encoded[:, HIDDEN_CHANNEL] > 0) & (encoded[:, FLAG_CHANNEL] == 0)
+    masked = np.where(hidden, logits, np.inf)
+    return masked.reshape(len(masked), -1).argmin(axis=1)
+
+
+class BatchedInference:
+    """ shares one model between many games by batching their forward passes
+
+    Any thread can submit an encoded board and wait on the returned Future. A
+    single worker thread takes whatever requests are queued, waits at most
+    max_wait seconds for more up to max_batch_size, and runs them through the
+    model in one call. Boards of different sizes are batched separately.
+    """
+
+    def __init__(self, model, max_batch_size=256, max_wait=0.002):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self.requests = queue.Queue()
+        self.worker = None
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def start(self) -> "BatchedInference":
+        self.worker = threading.Thread(target=self.run_loop, daemon=True)
+        self.worker.start()
+        return self
+
+    def stop(self) -> None:
+        if self.worker:
+            self.requests.put(None)
+            self.worker.join()
+            self.worker = None
+
+    def __enter__(self) -> "BatchedInference":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def submit(self, encoded) -> Future:
+        """ queue one (NUM_CHANNELS, rows, columns) board; the Future resolves to its (rows, columns) logits """
+        future = Future()
+        self.requests.put((np.asarray(encoded, dtype=np.float32), future))
+        return future
+
+    def predict(self, encoded) -> np.ndarray:
+        return self.submit(encoded).result()
+
+    def run_loop(self) -> None:
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            pending = [request]
+            stopping = False
+            deadline = time.perf_counter() + self.max_wait
+            while len(pending) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                pending.append(request)
+
+            by_shape = {}
+            for encoded, future in pending:
+                by_shape.setdefault(encoded.shape, []).append((encoded, future))
+            for group in by_shape.values():
+                self.run_batch(group)
+            if stopping:
+                return
+
+    def run_batch(self, group) -> None:
+        try:
+            logits = self.model(np.stack([encoded for encoded, _ in group]))
+        except Exception as error:
+            for _, future in group:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        self.items += len(group)
+        for (_, future), result in zip(group, logits):
+            future.set_result(result)
+
+
+def play_env_games(model, env, num_games) -> dict:
+    """ play games on a vectorized environment, one forward pass per step for every board """
+    observation = env.reset()
+    games = wins = steps = 0
+    start = time.perf_counter()
+    while games < num_games:
+        encoded = encode_observation(observation)
+        actions = choose_actions(encoded, model(encoded))
+        observation, _, dones, info = env.step(actions)
+        games += int(dones.sum())
+        wins += int(info['won'].sum())
+        steps += 1
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'wins': wins, 'steps': steps, 'boards_per_second': steps * env.num_envs / elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Play games with a convolutional policy, batching every board per step")
+    parser.add_argument('--weights', default=None, help="saved ConvPolicy weights (random weights when omitted)")
+    parser.add_argument('--difficulty', default='Beginner')
+    parser.add_argument('--boards', type=int, default=256, help="games played side by side")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = ConvPolicy.load(args.weights) if args.weights else ConvPolicy.random(seed=args.seed)
+    env = MinesweeperEnv.from_difficulty(args.difficulty, args.boards, seed=args.seed)
+    results = play_env_games(model, env, args.games)
+    print(f"games: {results['games']}  wins: {results['wins']}  "
+          f"boards/s: {results['boards_per_second']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
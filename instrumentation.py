@@ -0,0 +1,120 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+
+    def add(self, seconds) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def as_dict(self) -> dict:
+        return {'calls': self.calls, 'total_ms': 1000 * self.total,
+                'mean_ms': 1000 * self.total / self.calls if self.calls else 0.0,
+                'min_ms': 1000 * self.minimum if self.calls else 0.0, 'max_ms': 1000 * self.maximum}
+
+
+class Profiler:
+    """ opt-in timing of named hot paths with counts and a bounded trace of every call
+
+    instrument() wraps methods on one object by setting a timing wrapper as an
+    instance attribute over the class method. Objects that were never
+    instrumented run their plain methods, so profiling costs nothing unless it
+    is switched on. The trace keeps the last max_events calls and exports in
+    the Chrome trace event format, which chrome://tracing and Perfetto open.
+    """
+
+    def __init__(self, max_events=100000):
+        self.stats = {}
+        self.events = deque(maxlen=max_events)
+        self.instrumented = []      # (object, method name) pairs to undo
+        self.origin = time.perf_counter()
+
+    def record(self, name, start, seconds) -> None:
+        if name not in self.stats:
+            self.stats[name] = CallStats()
+        self.stats[name].add(seconds)
+        self.events.append((name, start, seconds, threading.get_ident()))
+
+    def timed(self, name, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, start, time.perf_counter() - start)
+        return wrapper
+
+    def timed_callback(self, name, factory):
+        """ wrap a method that returns a callback so the callback is timed, not the factory """
+        @functools.wraps(factory)
+        def wrapper(*args, **kwargs):
+            return self.timed(name, factory(*args, **kwargs))
+        return wrapper
+
+    def instrument(self, target, prefix, methods=(), callbacks=()) -> None:
+        """ time methods of one object as '<prefix>.<method>'; callbacks are methods returning a callback """
+        for method in methods:
+            setattr(target, method, self.timed(f"{prefix}.{method}", getattr(target, method)))
+            self.instrumented.append((target, method))
+        for method in callbacks:
+            setattr(target, method, self.timed_callback(f"{prefix}.{method}", getattr(target, method)))
+            self.instrumented.append((target, method))
+
+    def uninstrument(self) -> None:
+        """ remove every wrapper so the objects go back to their class methods """
+        for target, method in self.instrumented:
+            if method in vars(target):
+                delattr(target, method)
+        self.instrumented = []
+
+    def reset(self) -> None:
+        self.stats = {}
+        self.events.clear()
+        self.origin = time.perf_counter()
+
+    def snapshot(self) -> dict:
+        """ per-path call counts and timings in milliseconds """
+        return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def summary(self) -> str:
+        lines = [f"{'path':<32} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for name, stats in self.snapshot().items():
+            lines.append(f"{name:<32} {stats['calls']:>8} {stats['total_ms']:>10.2f} "
+                         f"{stats['mean_ms']:>9.3f} {stats['max_ms']:>9.3f}")
+        return '\n'.join(lines)
+
+    def trace(self) -> dict:
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': thread,
+                   'ts': 1e6 * (start - self.origin), 'dur': 1e6 * seconds}
+                  for name, start, seconds, thread in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_trace(self, path) -> None:
+        with open(path, 'w') as trace_file:
+            json.dump(self.trace(), trace_file)
+
+
+def instrument_game(profiler, game_manager) -> None:
+    """ time the logic, redraw and click paths of a GameManager """
+    profiler.instrument(game_manager.logic, 'logic',
+                        methods=['reveal_cell', 'toggle_flag', 'clear_adjacent_cells',
+                                 'count_current_score', 'check_for_win'])
+    if game_manager.GUI is not None:
+        instrument_gui(profiler, game_manager.GUI)
+    profiler.instrument(game_manager, 'game', callbacks=['on_left_click', 'on_right_click'])
+
+def instrument_gui(profiler, gui) -> None:
+    profiler.instrument(gui, 'gui', methods=['redraw_dirty_cells', 'draw_cell', 'reveal_board', 'clear_adjacent_cells'])
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import config
+from server import HOST, PORT, GameServer
+
+async def open_connection(host, port, unix_path) -> tuple:
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def new_session(reader, writer, difficulty) -> tuple:
+    writer.write(f"new {difficulty}\n".encode())
+    answer = (await reader.readline()).decode().split()
+    return answer[1], int(answer[2])
+
+async def run_client(host, port, unix_path, difficulty, depth, deadline, rng, totals) -> None:
+    """ one connection playing random moves, with depth requests in flight at a time """
+    reader, writer = await open_connection(host, port, unix_path)
+    session_id, size = await new_session(reader, writer, difficulty)
+    try:
+        while time.perf_counter() < deadline:
+            batch = []
+            for _ in range(depth):
+                row, column = rng.randrange(size), rng.randrange(size)
+                if rng.random() < 0.2:
+                    batch.append(f"board {session_id}\n")
+                else:
+                    batch.append(f"{'flag' if rng.random() < 0.1 else 'reveal'} {session_id} {row} {column}\n")
+            start = time.perf_counter()
+            writer.write(''.join(batch).encode())
+            finished = False
+            for _ in batch:
+                answer = await reader.readline()
+                finished = finished or answer.startswith(b'ok won') or answer.startswith(b'ok lost') \
+                    or answer.startswith(b'err game')
+            totals['latencies'].append(time.perf_counter() - start)
+            totals['requests'] += len(batch)
+            if finished:
+                writer.write(f"close {session_id}\n".encode())
+                await reader.readline()
+                session_id, size = await new_session(reader, writer, difficulty)
+                totals['requests'] += 2
+                totals['games'] += 1
+    finally:
+        writer.close()
+
+async def load_test(host=HOST, port=PORT, unix_path=None, difficulty='Beginner', connections=50, depth=16,
+                    seconds=10.0, seed=0, in_process=False) -> dict:
+    """ drive a server from many pipelined connections and measure sustained requests per second """
+    serving = None
+    if in_process:
+        ready = asyncio.Event()
+        serving = asyncio.create_task(GameServer().serve(host, port, unix_path, ready))
+        await ready.wait()
+
+    totals = {'requests': 0, 'games': 0, 'latencies': []}
+    start = time.perf_counter()
+    deadline = start + seconds
+    try:
+        await asyncio.gather(*(run_client(host, port, unix_path, difficulty, depth, deadline,
+                                          random.Random(seed + client), totals)
+                               for client in range(connections)))
+    finally:
+        if serving is not None:
+            serving.cancel()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(totals['latencies'])
+    return {'requests': totals['requests'], 'games': totals['games'], 'seconds': elapsed,
+            'requests_per_second': totals['requests'] / elapsed,
+            'batch_ms_p50': 1000 * statistics.median(latencies) if latencies else 0.0,
+            'batch_ms_p99': 1000 * latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sustained requests per second against the game server")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--unix', default=None, help="connect to this unix socket path instead of tcp")
+    parser.add_argument('--difficulty', choices=list(config.DIFFICULTIES.keys()), default='Beginner')
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--depth', type=int, default=16, help="requests each connection pipelines at a time")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--in-process', action='store_true', help="start a server in this process first")
+    args = parser.parse_args()
+
+    results = asyncio.run(load_test(args.host, args.port, args.unix, args.difficulty, args.connections,
+                                    args.depth, args.seconds, args.seed, args.in_process))
+    print(f"{results['requests']} requests, {results['games']} games finished in {results['seconds']:.1f}s: "
+          f"{results['requests_per_second']:.0f} requests/s, batch p50 {results['batch_ms_p50']:.2f}ms "
+          f"p99 {results['batch_ms_p99']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,40 @@
-import random
+import numpy as np
 
-from cell import Cell
+from board import ArrayBoard
+from cell import CellView
 
 class MinesweeperLogic:
-    NEIGHBOR_POSITIONS = \
-        [(-1, -1), (-1, 0), (-1, 1),  
-         (0, -1),           (0, 1),   
-         (1, -1), (1, 0), (1, 1)]     
+    NEIGHBOR_POSITIONS = ArrayBoard.NEIGHBOR_OFFSETS
         
     CORRECT_FLAG_POINTS = 20 
     
-    def __init__(self, controller):
+    def __init__(self, controller, seed=None):
         self.controller = controller
 
         self.num_mines = 0
         self.grid_size = 0
+
+        # seeded generator so a seed and first click always give the same board
+        self.rng = np.random.default_rng(seed)
+        self.safe_neighborhood = False
+        # optional callable (row, column) -> mine array, used instead of random placement
+        self.mine_source = None
     
         self.num_moves = 0
         self.user_score = 0
         
-        self.mine_coords = set()
+        self.board = None
+
+        # running counters so score and win checks never rescan the board
+        self.revealed_safe_cells = 0
+        self.correct_flags = 0
+        self.total_flags = 0
         
         self.running = False
         self.player = None
+
+        # optional replay.GameLog that every move is reported to
+        self.game_log = None
         
         
     def set_mines(self, mines) -> None:
@@ -30,43 +42,56 @@ class MinesweeperLogic:
     
     def set_difficulty(self, size) -> None:
         self.grid_size = size
+
+    def set_seed(self, seed) -> None:
+        self.rng = np.random.default_rng(seed)
+
+    def set_safe_neighborhood(self, enabled) -> None:
+        """ keep the whole 3x3 area around the first click free of mines, not just the clicked cell """
+        self.safe_neighborhood = enabled
         
+    def set_mine_source(self, source) -> None:
+        """ deal mines from a source such as noguess.NoGuessPool.take; None goes back to random placement """
+        self.mine_source = source
+
     def create_board(self) -> None:
-        self.board = [[Cell() for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+        if self.board is not None and self.board.shape == (self.grid_size, self.grid_size):
+            # a new game of the same size reuses the arrays of the last one
+            self.board.reset()
+        else:
+            self.board = ArrayBoard(self.grid_size, self.grid_size)
+        self.num_moves = 0
+        self.user_score = 0
+        self.running = False
+        self.revealed_safe_cells = 0
+        self.correct_flags = 0
+        self.total_flags = 0
+        self.game_log = None
 
+    @property
+    def mine_coords(self) -> set:
+        return {(int(row), int(col)) for row, col in zip(*np.nonzero(self.board.mines))}
 
-    def fill_board(self) -> None:
-        self.generate_mines()
+    def fill_board(self, row, column) -> None:
+        self.generate_mines(row, column)
         self.fill_numbers_or_empty()
+        # flags may have been placed before the mines existed
+        self.correct_flags = int(np.count_nonzero(self.board.mines & self.board.flagged))
         self.user_score = self.count_current_score()
+        if self.game_log is not None:
+            self.game_log.record_mines(self)
         
-    def generate_mines(self) -> None:
-        while len(self.mine_coords) < self.num_mines:
-            row, column = self.get_random_cell()
-            if self.can_place_mine(row, column):
-                self.place_mine(row, column)
-
-    def get_random_cell(self) -> tuple:
-        return (random.randint(0, self.grid_size - 1), random.randint(0, self.grid_size - 1))
-    
-    def can_place_mine(self, row, column) -> bool:
-        cell = self.select_cell(row, column)
-        return cell.is_blank # cells that are 'blank', and not 'empty' can have mines placed in them
-            
-    def place_mine(self, row, column) -> None:
-        cell = self.select_cell(row, column)
-        self.mine_coords.add((row,column))
-        cell.is_mine = True   
+    def generate_mines(self, row, column) -> None:
+        """ place every mine in one pass, keeping the first clicked cell safe """
+        if self.mine_source is not None:
+            self.board.mines = np.array(self.mine_source(row, column), dtype=bool)
+            return
+        self.board.place_random_mines(self.num_mines, self.rng, row, column, self.safe_neighborhood)
             
     def fill_numbers_or_empty(self) -> None:
         """ fill remaining cells after mines placed """
-        self.iterate_through_board(self.check_number_or_empty)
-                                                   
-    def check_number_or_empty(self, row_num, col, cell) -> None:
-        if self.count_adjacent_mines(row_num, col) > 0 and cell.is_blank:
-            self.set_adjacent_type(row_num, col, cell)
-        elif not cell.is_mine:
-            cell.is_empty = True
+        self.board.compute_adjacent()
+        self.board.label_empty_regions()
 
     def iterate_through_board(self, function):
         for row_num, row in enumerate(self.board):
@@ -75,19 +100,18 @@ class MinesweeperLogic:
                 if result is not None:
                     return result
 
-    def set_adjacent_type(self, row_num, col, cell) -> None:
-        cell.adjacent_mines = self.count_adjacent_mines(row_num, col)
-        cell.set_number(cell.adjacent_mines)
-        cell.is_numbered = True
-
-    def reveal_cell(self, row, column) -> Cell:
+    def reveal_cell(self, row, column) -> CellView:
+        if self.game_log is not None:
+            self.game_log.record(self, 'reveal', row, column)
         cell = self.select_cell(row, column)
-        cell.is_revealed = True
+        if not self.board.revealed[row, column]:
+            self.board.revealed[row, column] = True
+            # the first click can never be a mine, so it is safe to count before filling
+            if self.num_moves == 0 or not cell.is_mine:
+                self.revealed_safe_cells += 1
         
         if self.num_moves == 0:
-            cell.is_empty = True
-            cell.is_blank = False
-            self.fill_board()
+            self.fill_board(row, column)
             self.num_moves += 1
         elif not cell.is_mine and self.num_moves > 0:
             self.user_score = self.count_current_score()
@@ -95,106 +119,85 @@ class MinesweeperLogic:
             
         return cell
     
+    def open_cell(self, row, column) -> CellView:
+        """ play a reveal: a mine ends the game and an empty cell opens its whole region """
+        cell = self.reveal_cell(row, column)
+        if cell.is_mine:
+            self.running = False
+        elif cell.is_empty:
+            self.clear_adjacent_cells(row, column)
+        return cell
+
     def toggle_flag(self, row, column) -> str:
-        cell = self.select_cell(row, column)
+        revealed = self.board.revealed[row, column]
+        flagged = self.board.flagged[row, column]
+        is_mine = int(self.board.mines[row, column])
+
+        if self.game_log is not None and not revealed:
+            self.game_log.record(self, 'flag', row, column)
     
-        if (not cell.is_revealed) and not cell.is_flagged:
-            cell.is_flagged = True
+        if (not revealed) and not flagged:
+            self.board.flagged[row, column] = True
+            self.total_flags += 1
+            self.correct_flags += is_mine
             return 'setflag'
-        elif (not cell.is_revealed) and cell.is_flagged:
-            cell.is_flagged = False
+        elif (not revealed) and flagged:
+            self.board.flagged[row, column] = False
+            self.total_flags -= 1
+            self.correct_flags -= is_mine
             return 'unset_flag'
         else:
             self.controller.show_error("ERROR", "Unexpected error, please reload program and play again")
             return 'error'
 
     def clear_adjacent_cells(self, row, col) -> set: 
-        """ function that checks if adjacent cells are empty, and if so it clears them"""
-        to_reveal = set()       # this set is used keep track of if cells are found that need to be revealed locally
-        to_reveal.add((row, col))
+        """ reveal the precomputed empty region (and its numbered border) containing the cell """
+        if self.board.mines[row, col]:
+            return set()
 
-        revealed_cells = set()  # Set to keep track of all the cells that need to be revealed globally on all iterations 
+        revealed_cells = {(row, col)}
+        # only cells that were still hidden are reported back to the gui
+        newly_revealed = self.board.open_cell(row, col)
+        self.revealed_safe_cells += len(newly_revealed)
+        rows, columns = np.divmod(newly_revealed, self.board.columns)
+        revealed_cells.update(zip(rows.tolist(), columns.tolist()))
 
-        while to_reveal:
-            current_row, current_col = to_reveal.pop()
-            curr_cell = self.select_cell(current_row, current_col)
-            
-            # If the cell is already revealed or is a mine, skip it 
-            if (current_row, current_col) in revealed_cells or curr_cell.is_mine:
-                continue            
-
-            revealed_cells.add((current_row, current_col))
-            curr_cell.is_revealed = True
-
-            # If the current cell is empty, add its neighbors to the set
-            if curr_cell.is_empty:
-
-                for row_offset, col_offset in self.NEIGHBOR_POSITIONS:
-                    neighbor_row, neighbor_col = current_row + row_offset, current_col + col_offset
-                    # Check if the neighbor is within the bounds of the board
-                    if 0 <= neighbor_row < len(self.board) and 0 <= neighbor_col < len(self.board[0]):
-                        neighbor_cell = self.board[neighbor_row][neighbor_col]
-                        # Add the cell to be revealed if it is not a mine and not already revealed
-                        if not neighbor_cell.is_mine and not neighbor_cell.is_revealed:
-                            to_reveal.add((neighbor_row, neighbor_col))
         self.user_score = self.count_current_score()
         return revealed_cells
 
     def count_adjacent_mines(self, row, col) -> int:
-        count = 0
-        for row_offset, col_offset in self.NEIGHBOR_POSITIONS:
-            neighbor_row, neighbor_col = row + row_offset, col + col_offset
-            # Check if the neighbor is within the bounds of the board
-            if 0 <= neighbor_row < len(self.board) and 0 <= neighbor_col < len(self.board[0]):
-                if self.select_cell(neighbor_row, neighbor_col).is_mine:
-                    count += 1
-
-        return count
+        return self.board.count_adjacent_mines(row, col)
 
     def count_current_score(self) -> int:
-        score = 0
-        for row in self.board:
-            for cell in row:
-                score += self.process_current_cell_score(cell)
+        score = self.revealed_safe_cells
 
         if self.check_for_win():
             if self.all_mines_flagged():
                 return self.count_maximum_score()
             else:
                 # Update score with the temporary score calculated
-                return (score + (sum(cell.is_flagged for row in self.board for cell in row)) * self.CORRECT_FLAG_POINTS)
+                return score + self.total_flags * self.CORRECT_FLAG_POINTS
         else:
             return score
-    
-    def process_current_cell_score(self, cell) -> int:
-        if not cell.is_mine and cell.is_revealed:
-            return 1
-        return 0
 
     def all_mines_flagged(self) -> bool:
-        return all(cell.is_mine and cell.is_flagged for row in self.board for cell in row)
+        return self.correct_flags == self.num_mines
 
-    def select_cell(self, row, column) -> Cell:
-        cell = self.board[row][column]
-        return cell
+    def select_cell(self, row, column) -> CellView:
+        return self.board.cell(row, column)
 
     def count_maximum_score(self) -> int:
         """ Calculate the maximum possible score. """
-        max_score = 0
-        for row in self.board:
-            for cell in row:
-                if cell.is_mine:
-                    max_score += 1
+        max_score = self.num_mines
         return max_score + (self.num_mines * self.CORRECT_FLAG_POINTS) 
 
     def check_for_win(self) -> bool:
         """function to check if the player has won the game"""
-        for row in self.board:
-            for cell in row:
-                # if we find a cell that is not a mine and is not revealed yet, then we need to keep going
-                if not cell.is_mine and not cell.is_revealed:
-                    return False
-        return True                    
+        # the game is won once every cell that is not a mine has been revealed
+        return self.revealed_safe_cells == self.count_safe_cells()
+
+    def count_safe_cells(self) -> int:
+        return self.grid_size * self.grid_size - self.num_mines
     
     def get_score(self) -> int:
-        return self.user_score
\ No newline at end of file
+        return self.user_score
@@ -1,15 +1,16 @@
-from game_manager import GameManager
+import sys
 
 def main():
-    global game_manager
-    game_manager = GameManager(restart_game)
+    # imported here so the headless game never loads tkinter
+    from game_manager import GameManager
+    # restarting happens inside the game manager, so one manager and one Tk root serve every game
+    game_manager = GameManager()
     game_manager.start_welcome_screen()
 
-def restart_game():
-    global game_manager
-    del game_manager
-    main()
-
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    if '--headless' in sys.argv[1:]:
+        import headless
+        headless.main([argument for argument in sys.argv[1:] if argument != '--headless'])
+    else:
+        main() 
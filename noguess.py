@@ -0,0 +1,169 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+import config
+from board import ArrayBoard
+from solver import MinesweeperSolver
+
+def solvable(board, num_mines, row, column, solver) -> bool:
+    """ whether the solver clears a filled board from a first click without ever guessing """
+    board.open_cell(row, column)
+    safe_cells = board.rows * board.columns - num_mines
+    known_mines = set()
+    while np.count_nonzero(board.revealed) < safe_cells:
+        result = solver.solve_board(board, num_mines, known_mines)
+        known_mines |= result.mines
+        safe = [cell for cell in result.safe if not board.revealed[cell]]
+        if not safe:
+            return False
+        for cell in safe:
+            board.open_cell(*cell)
+    return True
+
+def generate_no_guess_mines(rows, columns, num_mines, rng, row, column, solver=None,
+                            max_attempts=10000) -> np.ndarray:
+    """ rejection-sample mine layouts until one can be solved from (row, column) without guessing
+
+    The 3x3 area around the first click is always kept free so the click opens
+    a region; a click on a number alone almost never leads anywhere without a guess.
+    """
+    solver = solver or MinesweeperSolver()
+    for _ in range(max_attempts):
+        board = ArrayBoard(rows, columns)
+        board.place_random_mines(num_mines, rng, row, column, safe_neighborhood=True)
+        board.compute_adjacent()
+        board.label_empty_regions()
+        if solvable(board, num_mines, row, column, solver):
+            return board.mines
+    raise RuntimeError(f"no guess-free board with {num_mines} mines found in {max_attempts} attempts")
+
+def opening_mask(mines, row, column) -> np.ndarray:
+    """ the empty cells that open the same region as an empty (row, column) """
+    board = ArrayBoard(*mines.shape)
+    board.mines = mines
+    board.compute_adjacent()
+    board.label_empty_regions()
+    label = board.region_labels[row, column]
+    if label < 0:
+        opening = np.zeros(mines.shape, dtype=bool)
+        opening[row, column] = True
+        return opening
+    return board.region_labels == label
+
+def symmetries(mask) -> list:
+    """ every rotation and reflection of a board that keeps its shape """
+    turns = range(4) if mask.shape[0] == mask.shape[1] else (0, 2)
+    return [np.rot90(flipped, turn) for flipped in (mask, mask[:, ::-1]) for turn in turns]
+
+def produce_boards(rows, columns, num_mines, seed, boards, stop) -> None:
+    """ worker process: keep generating guess-free boards from random first clicks """
+    rng = np.random.default_rng(seed)
+    solver = MinesweeperSolver()
+    while not stop.is_set():
+        row, column = int(rng.integers(rows)), int(rng.integers(columns))
+        mines = generate_no_guess_mines(rows, columns, num_mines, rng, row, column, solver)
+        while not stop.is_set():
+            try:
+                boards.put((mines, row, column), timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+
+class NoGuessPool:
+    """ pool of pre-generated guess-free boards kept full by background processes
+
+    A board generated from one first click is just as solvable from any empty
+    cell of the region that click opens, and from the matching cell of any
+    rotation or reflection of the board. take() looks for a pooled board whose
+    opening covers the clicked cell under one of those symmetries and only
+    generates a board on the spot when none does, so take() is only instant on
+    a hit; a miss costs a full generation on the calling thread.
+
+    At most size boards are held: collect() stops taking boards once the pool
+    is full, which leaves the queue full and the workers blocked until a
+    board is handed out.
+    """
+
+    def __init__(self, rows, columns, num_mines, size=32, workers=None, seed=None):
+        self.rows = rows
+        self.columns = columns
+        self.num_mines = num_mines
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+
+        self.entries = []           # (mines, opening mask) ready to hand out
+        self.hits = 0
+        self.misses = 0
+
+        self.boards = multiprocessing.Queue(size)
+        self.stop_event = multiprocessing.Event()
+        # with no workers every board is generated on the spot from this pool's own generator
+        workers = os.cpu_count() if workers is None else workers
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        self.processes = [multiprocessing.Process(
+            target=produce_boards, daemon=True,
+            args=(rows, columns, num_mines, worker_seed, self.boards, self.stop_event))
+            for worker_seed in seeds]
+        for process in self.processes:
+            process.start()
+
+    @classmethod
+    def from_difficulty(cls, difficulty, **kwargs) -> "NoGuessPool":
+        settings = config.DIFFICULTIES[difficulty]
+        return cls(settings['size'], settings['size'], settings['mines'], **kwargs)
+
+    def collect(self) -> None:
+        """ move finished boards from the workers into the pool until it holds size boards """
+        while len(self.entries) < self.size:
+            try:
+                mines, row, column = self.boards.get_nowait()
+            except queue.Empty:
+                return
+            self.entries.append((mines, opening_mask(mines, row, column)))
+
+    def take(self, row, column) -> np.ndarray:
+        """ mines of a guess-free board for a first click on (row, column) """
+        self.collect()
+        for index, (mines, opening) in enumerate(self.entries):
+            for transformed_mines, transformed_opening in zip(symmetries(mines), symmetries(opening)):
+                if transformed_opening[row, column]:
+                    del self.entries[index]
+                    self.hits += 1
+                    return transformed_mines.copy()
+        self.misses += 1
+        return generate_no_guess_mines(self.rows, self.columns, self.num_mines, self.rng, row, column)
+
+    def close(self) -> None:
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure guess-free board generation")
+    parser.add_argument('--difficulty', choices=list(config.DIFFICULTIES.keys()), default='Expert')
+    parser.add_argument('--boards', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    settings = config.DIFFICULTIES[args.difficulty]
+    rng = np.random.default_rng(args.seed)
+    center = settings['size'] // 2
+    start = time.perf_counter()
+    for _ in range(args.boards):
+        generate_no_guess_mines(settings['size'], settings['size'], settings['mines'], rng, center, center)
+    elapsed = time.perf_counter() - start
+    print(f"{args.difficulty}: {1000 * elapsed / args.boards:.1f}ms per guess-free board")
+
+
+if __name__ == "__main__":
+    main()
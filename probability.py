@@ -0,0 +1,209 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from solver import SolverState
+from transposition import TranspositionTable
+
+class MineProbabilityEngine:
+    """ exact per-cell mine probabilities for the hidden cells of a board
+
+    The frontier is split into independent components. Each component's mine
+    layouts are counted by a memoized search, grouped by how many mines they
+    use, and the components are then combined with the mines left for the
+    unconstrained cells through binomial weighting. Component results are kept
+    in an LRU cache keyed on their constraints, so components a move did not
+    touch are reused instead of being enumerated again.
+    """
+
+    def __init__(self, cache_size=4096):
+        self.cache = TranspositionTable(cache_size)
+
+    @property
+    def cache_hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self.cache.misses
+
+    def probabilities(self, board, num_mines, known_mines=()) -> np.ndarray:
+        """ mine probability per cell: 0 for revealed cells, 1 for known mines """
+        columns = board.columns
+        state = SolverState(board, num_mines, {row * columns + col for row, col in known_mines})
+        result = np.zeros(board.rows * board.columns)
+        if state.mines:
+            result[list(state.mines)] = 1.0
+
+        components = state.components()
+        distributions = [self.component_distribution(cells, constraints, state.mines_left)
+                         for cells, constraints in components]
+
+        frontier_cells = sum(len(cells) for cells, _ in components)
+        unconstrained = state.unknown_count() - frontier_cells
+        mines_left = state.mines_left
+
+        # weight of every possible number of frontier mines, once the rest are spread over unconstrained cells
+        def rest_weights(frontier_mines):
+            left = mines_left - frontier_mines
+            weights = np.zeros(len(frontier_mines))
+            valid = (left >= 0) & (left <= unconstrained)
+            log_weights = np.array([log_comb(unconstrained, int(k)) for k in left[valid]])
+            if len(log_weights):
+                weights[valid] = np.exp(log_weights - log_weights.max())
+            return weights
+
+        totals = [counts for counts, _ in distributions]
+        prefix = [np.ones(1)]
+        for counts in totals:
+            prefix.append(np.convolve(prefix[-1], counts))
+        suffix = [np.ones(1)]
+        for counts in reversed(totals):
+            suffix.append(np.convolve(suffix[-1], counts))
+        suffix.reverse()
+
+        combined = prefix[-1]
+        weights = rest_weights(np.arange(len(combined)))
+        normalizer = float(combined @ weights)
+        if normalizer == 0:
+            raise ValueError("contradictory board state")
+
+        for index, ((cells, _), (counts, cell_counts)) in enumerate(zip(components, distributions)):
+            others = np.convolve(prefix[index], suffix[index + 1])
+            # weight of this component using k mines, summed over every split of the others
+            factors = np.array([others @ weights[k:k + len(others)] for k in range(len(counts))])
+            result[cells] = (cell_counts.T @ factors) / normalizer
+
+        if unconstrained:
+            hidden = np.zeros(board.rows * board.columns, dtype=bool)
+            hidden[list(state.unknown_cells())] = True
+            hidden[[cell for cells, _ in components for cell in cells]] = False
+            expected_rest = float((combined * weights) @ (mines_left - np.arange(len(combined)))) / normalizer
+            result[hidden] = expected_rest / unconstrained
+
+        return result.reshape(board.shape)
+
+    def component_distribution(self, cells, constraints, max_mines) -> tuple:
+        """ normalized layout counts by mine total, reused from the cache when possible """
+        key = (frozenset(constraints), min(max_mines, len(cells)))
+        distribution = self.cache.get(key)
+        if distribution is None:
+            distribution = count_layouts(cells, constraints, max_mines)
+            self.cache.put(key, distribution)
+        return distribution
+
+    def safest_cell(self, board, num_mines, known_mines=()) -> tuple:
+        """ the hidden, unresolved cell least likely to hold a mine """
+        probabilities = self.probabilities(board, num_mines, known_mines)
+        probabilities[board.revealed] = np.inf
+        for row, col in known_mines:
+            probabilities[row, col] = np.inf
+        row, col = np.unravel_index(np.argmin(probabilities), board.shape)
+        return int(row), int(col)
+
+
+def log_comb(n, k) -> float:
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+def count_layouts(cells, constraints, max_mines) -> tuple:
+    """ count every consistent mine layout of a component, grouped by mine total
+
+    Cells are visited in breadth-first order so each constraint is open over a
+    short stretch of cells. The search state after a cell is just the mines
+    placed in the still-open constraints, so identical sub-configurations are
+    counted once and shared. Returns (counts, cell_counts) normalized to sum to
+    one: counts[k] is the share of layouts using k mines, and cell_counts[k]
+    the share of those layouts that put a mine on each cell.
+    """
+    order = breadth_first_order(cells, constraints)
+    position = {cell: index for index, cell in enumerate(order)}
+    size = len(order)
+
+    targets = [count for _, count in constraints]
+    members = [sorted(position[cell] for cell in constraint_cells) for constraint_cells, _ in constraints]
+    at_cell = [[] for _ in range(size)]
+    for constraint, indices in enumerate(members):
+        for index in indices:
+            at_cell[index].append(constraint)
+    # constraints with cells both before and at or after each position
+    open_at = [[constraint for constraint, indices in enumerate(members) if indices[0] < index <= indices[-1]]
+               for index in range(size + 1)]
+    cells_after = [{constraint: sum(1 for other in members[constraint] if other > index)
+                    for constraint in at_cell[index]} for index in range(size)]
+
+    def advance(index, state, value):
+        placed = dict(zip(open_at[index], state))
+        for constraint in at_cell[index]:
+            mines = placed.get(constraint, 0) + value
+            if mines > targets[constraint] or mines + cells_after[index][constraint] < targets[constraint]:
+                return None
+            placed[constraint] = mines
+        return tuple(placed.get(constraint, 0) for constraint in open_at[index + 1])
+
+    # forward pass: every search state reachable at each position
+    levels = [{()}]
+    transitions = []
+    for index in range(size):
+        reachable = set()
+        moves = {}
+        for state in levels[index]:
+            moves[state] = [(value, advance(index, state, value)) for value in (0, 1)]
+            reachable.update(child for _, child in moves[state] if child is not None)
+        levels.append(reachable)
+        transitions.append(moves)
+
+    # backward pass: layouts of the remaining cells from each state, by mine total
+    below = {(): {0: (1.0, np.zeros(0))}}
+    for index in reversed(range(size)):
+        current = {}
+        for state, moves in transitions[index].items():
+            totals = {}
+            for value, child in moves:
+                if child is None or child not in below:
+                    continue
+                for mines, (count, cell_counts) in below[child].items():
+                    count_so_far, counts_so_far = totals.get(mines + value, (0.0, np.zeros(size - index)))
+                    counts_so_far = counts_so_far.copy()
+                    counts_so_far[0] += value * count
+                    counts_so_far[1:] += cell_counts
+                    totals[mines + value] = (count_so_far + count, counts_so_far)
+            if totals:
+                current[state] = totals
+        below = current
+
+    by_mines = below.get((), {})
+    limit = min(max_mines, size)
+    counts = np.zeros(limit + 1)
+    cell_counts = np.zeros((limit + 1, len(cells)))
+    reorder = [position[cell] for cell in cells]
+    for mines, (count, per_cell) in by_mines.items():
+        if mines <= limit:
+            counts[mines] = count
+            cell_counts[mines] = per_cell[reorder]
+
+    total = counts.sum()
+    if total:
+        counts /= total
+        cell_counts /= total
+    return counts, cell_counts
+
+def breadth_first_order(cells, constraints) -> list:
+    neighbors = {cell: set() for cell in cells}
+    for constraint_cells, _ in constraints:
+        for cell in constraint_cells:
+            neighbors[cell] |= constraint_cells
+
+    order, seen = [], set()
+    for start in sorted(cells):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            order.append(cell)
+            for neighbor in sorted(neighbors[cell] - seen):
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return order
@@ -0,0 +1,203 @@
+import os
+
+import numpy as np
+
+from board import count_neighbors
+
+MAGIC = b'MSWPREC1'
+HEADER = np.dtype([('magic', 'S8'), ('rows', '<u4'), ('columns', '<u4')])
+
+REVEAL = 0
+FLAG = 1
+
+HIDDEN = -1
+
+def game_dtype(rows, columns) -> np.dtype:
+    plane = (rows * columns + 7) // 8
+    return np.dtype([('seed', '<i8'), ('first_move', '<u8'), ('num_moves', '<u4'),
+                     ('won', 'u1'), ('mines', 'u1', (plane,))])
+
+def move_dtype(rows, columns) -> np.dtype:
+    plane = (rows * columns + 7) // 8
+    return np.dtype([('game', '<u4'), ('action', '<u4'), ('kind', 'u1'), ('result', 'i1'),
+                     ('revealed', 'u1', (plane,)), ('flagged', 'u1', (plane,))])
+
+def pack_plane(mask) -> np.ndarray:
+    return np.packbits(np.asarray(mask, dtype=bool).ravel())
+
+def unpack_planes(packed, rows, columns) -> np.ndarray:
+    """ unpack a (N, plane_bytes) array of bit-packed planes into (N, rows, columns) booleans """
+    bits = np.unpackbits(packed, axis=-1, count=rows * columns)
+    return bits.reshape(len(packed), rows, columns).view(bool)
+
+
+def pack_moves(moves, rows, columns) -> np.ndarray:
+    """ move records for one game, with the game index left for the writer to fill in
+
+    moves is a sequence of (revealed, flagged, action, kind, result) with
+    the planes as they were before the action, the action as a flat cell
+    index, kind REVEAL or FLAG and result 1 for a safe move, -1 for a mine.
+    """
+    move_records = np.zeros(len(moves), dtype=move_dtype(rows, columns))
+    if moves:
+        revealed, flagged, actions, kinds, results = zip(*moves)
+        move_records['action'] = actions
+        move_records['kind'] = kinds
+        move_records['result'] = results
+        move_records['revealed'] = np.packbits(np.reshape(revealed, (len(moves), -1)).astype(bool), axis=1)
+        move_records['flagged'] = np.packbits(np.reshape(flagged, (len(moves), -1)).astype(bool), axis=1)
+    return move_records
+
+
+class GameRecordWriter:
+    """ append-only writer for played games
+
+    A dataset is a pair of files sharing one board size: <path>.games holds one
+    fixed-size record per game (seed, outcome and bit-packed mine plane) and
+    <path>.moves one fixed-size record per move (action plus the bit-packed
+    revealed and flag planes seen before it). Fixed-size records let the reader
+    memory-map both files directly as numpy structured arrays.
+    """
+
+    def __init__(self, path, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.game_dtype = game_dtype(rows, columns)
+        self.move_dtype = move_dtype(rows, columns)
+
+        self.games_path = f"{path}.games"
+        self.moves_path = f"{path}.moves"
+        for file_path in (self.games_path, self.moves_path):
+            prepare_file(file_path, rows, columns)
+
+        # an interrupted append can leave a partial record at the end of either file, and moves of a game
+        # whose game record was never written; cut both back to the last complete game before appending
+        self.num_games = record_count(self.games_path, self.game_dtype)
+        truncate_records(self.games_path, self.game_dtype, self.num_games)
+        self.num_moves = 0
+        if self.num_games:
+            last = np.fromfile(self.games_path, dtype=self.game_dtype, count=1,
+                               offset=HEADER.itemsize + (self.num_games - 1) * self.game_dtype.itemsize)[0]
+            self.num_moves = int(last['first_move']) + int(last['num_moves'])
+        self.num_moves = min(self.num_moves, record_count(self.moves_path, self.move_dtype))
+        truncate_records(self.moves_path, self.move_dtype, self.num_moves)
+
+    def add_game(self, seed, mines, moves, won) -> None:
+        """ append one finished game; moves are as pack_moves takes them """
+        self.add_packed_game(seed, mines, pack_moves(moves, self.rows, self.columns), won)
+
+    def add_packed_game(self, seed, mines, move_records, won) -> None:
+        """ append one finished game whose moves were already packed, possibly in another process """
+        move_records = move_records.copy()
+        move_records['game'] = self.num_games
+
+        game_record = np.zeros(1, dtype=self.game_dtype)
+        game_record['seed'] = seed
+        game_record['first_move'] = self.num_moves
+        game_record['num_moves'] = len(move_records)
+        game_record['won'] = won
+        game_record['mines'] = pack_plane(mines)
+
+        # moves go first so a game record never points past the end of the moves file
+        with open(self.moves_path, 'ab') as moves_file:
+            moves_file.write(move_records.tobytes())
+        with open(self.games_path, 'ab') as games_file:
+            games_file.write(game_record.tobytes())
+
+        self.num_games += 1
+        self.num_moves += len(move_records)
+
+
+class GameRecordReader:
+    """ memory-mapped view of a game record dataset that decodes one batch at a time """
+
+    def __init__(self, path):
+        self.games_path = f"{path}.games"
+        self.moves_path = f"{path}.moves"
+        self.rows, self.columns = read_header(self.games_path)
+        if read_header(self.moves_path) != (self.rows, self.columns):
+            raise ValueError(f"{path}: games and moves files disagree on the board size")
+
+        self.games = map_records(self.games_path, game_dtype(self.rows, self.columns))
+        self.moves = map_records(self.moves_path, move_dtype(self.rows, self.columns))
+
+        # ignore moves appended after the last complete game record
+        if len(self.games):
+            last = self.games[-1]
+            self.moves = self.moves[:int(last['first_move']) + int(last['num_moves'])]
+        else:
+            self.moves = self.moves[:0]
+
+    @property
+    def num_games(self) -> int:
+        return len(self.games)
+
+    @property
+    def num_moves(self) -> int:
+        return len(self.moves)
+
+    def decode(self, indices) -> dict:
+        """ turn the move records at the given indices into numpy training arrays """
+        moves = self.moves[indices]
+        games = self.games[moves['game']]
+
+        mines = unpack_planes(games['mines'], self.rows, self.columns)
+        revealed = unpack_planes(moves['revealed'], self.rows, self.columns)
+        flagged = unpack_planes(moves['flagged'], self.rows, self.columns)
+        observation = np.where(revealed, count_neighbors(mines), np.int8(HIDDEN))
+
+        return {
+            'observation': observation,
+            'flagged': flagged,
+            'action': moves['action'].astype(np.int64),
+            'kind': moves['kind'],
+            'result': moves['result'],
+            'won': games['won'].astype(bool),
+            'mines': mines,
+        }
+
+    def batches(self, batch_size, shuffle=False, seed=None):
+        """ yield decoded batches of moves; only the current batch is ever unpacked in memory """
+        order = np.arange(self.num_moves)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, self.num_moves, batch_size):
+            indices = order[start:start + batch_size]
+            if not shuffle:
+                indices = slice(start, start + batch_size)
+            yield self.decode(indices)
+
+
+def prepare_file(path, rows, columns) -> None:
+    """ create a record file with its header, or check the header of an existing one """
+    if os.path.exists(path) and os.path.getsize(path) >= HEADER.itemsize:
+        if read_header(path) != (rows, columns):
+            raise ValueError(f"{path} holds {read_header(path)} boards, not {(rows, columns)}")
+        return
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'] = MAGIC
+    header['rows'] = rows
+    header['columns'] = columns
+    with open(path, 'wb') as record_file:
+        record_file.write(header.tobytes())
+
+def read_header(path) -> tuple:
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path} is not a game record file")
+    return int(header['rows'][0]), int(header['columns'][0])
+
+def record_count(path, dtype) -> int:
+    return (os.path.getsize(path) - HEADER.itemsize) // dtype.itemsize
+
+def truncate_records(path, dtype, count) -> None:
+    """ drop everything after the first count records """
+    size = HEADER.itemsize + count * dtype.itemsize
+    if os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+def map_records(path, dtype) -> np.ndarray:
+    count = record_count(path, dtype)
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.itemsize, shape=(count,))
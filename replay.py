@@ -0,0 +1,153 @@
+import json
+
+import numpy as np
+
+from logic import MinesweeperLogic
+from records import FLAG, REVEAL, unpack_planes
+
+MOVE_KINDS = {'reveal': REVEAL, 'flag': FLAG}
+
+class GameLog:
+    """ a game stored as its starting random state plus every move made
+
+    Replaying the moves from the random state rebuilds any position. Every
+    snapshot_interval moves a compact snapshot (bit-packed revealed and flag
+    planes plus the logic counters) is stored as well, so seeking to a move only
+    replays the moves since the nearest snapshot instead of the whole game.
+    A reveal move is replayed the way GameManager plays it: the cell is revealed
+    and, when it is empty, its region is cleared.
+    """
+
+    DEFAULT_SNAPSHOT_INTERVAL = 25
+
+    def __init__(self, grid_size, num_mines, rng_state, safe_neighborhood=False,
+                 snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        self.grid_size = grid_size
+        self.num_mines = num_mines
+        self.rng_state = rng_state
+        self.safe_neighborhood = safe_neighborhood
+        self.snapshot_interval = snapshot_interval
+
+        self.moves = []         # (kind, row, column)
+        self.snapshots = {}     # move index -> state before that move
+        self.mines = None       # bit-packed mine plane, known once the first reveal has filled the board
+
+    @classmethod
+    def start(cls, logic, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL) -> "GameLog":
+        """ begin recording a freshly created board; call after create_board and before the first move """
+        game_log = cls(logic.grid_size, logic.num_mines, logic.rng.bit_generator.state,
+                       logic.safe_neighborhood, snapshot_interval)
+        logic.game_log = game_log
+        return game_log
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def record(self, logic, kind, row, column) -> None:
+        """ called by MinesweeperLogic before it applies a move """
+        index = len(self.moves)
+        # the state before this move includes the cascade of the previous one
+        if index and index % self.snapshot_interval == 0 and logic.board.filled:
+            self.snapshots[index] = self.take_snapshot(logic)
+        self.moves.append((kind, int(row), int(column)))
+
+    def record_mines(self, logic) -> None:
+        """ called by MinesweeperLogic once the first reveal has placed the mines """
+        self.mines = np.packbits(logic.board.mines.ravel())
+
+    def take_snapshot(self, logic) -> dict:
+        return {
+            'revealed': np.packbits(logic.board.revealed.ravel()),
+            'flagged': np.packbits(logic.board.flagged.ravel()),
+            'counters': np.array([logic.num_moves, logic.user_score, logic.revealed_safe_cells,
+                                  logic.correct_flags, logic.total_flags], dtype=np.int64),
+        }
+
+    def new_logic(self) -> MinesweeperLogic:
+        logic = MinesweeperLogic(None)
+        logic.rng.bit_generator.state = self.rng_state
+        logic.set_difficulty(self.grid_size)
+        logic.set_mines(self.num_mines)
+        logic.set_safe_neighborhood(self.safe_neighborhood)
+        if self.mines is not None:
+            # boards from a mine source such as a no-guess pool cannot be redrawn from the random state
+            logic.set_mine_source(lambda row, column: self.unpacked_mines())
+        logic.create_board()
+        logic.running = True
+        return logic
+
+    def unpacked_mines(self) -> np.ndarray:
+        return unpack_planes(self.mines[None], self.grid_size, self.grid_size)[0].copy()
+
+    def restore(self, index) -> MinesweeperLogic:
+        """ rebuild the board exactly as it was before the snapshotted move """
+        snapshot = self.snapshots[index]
+        logic = self.new_logic()
+        board = logic.board
+        board.mines = self.unpacked_mines()
+        board.compute_adjacent()
+        board.label_empty_regions()
+        board.revealed = unpack_planes(snapshot['revealed'][None], self.grid_size, self.grid_size)[0].copy()
+        board.flagged = unpack_planes(snapshot['flagged'][None], self.grid_size, self.grid_size)[0].copy()
+        (logic.num_moves, logic.user_score, logic.revealed_safe_cells,
+         logic.correct_flags, logic.total_flags) = (int(value) for value in snapshot['counters'])
+        return logic
+
+    def state_at(self, index) -> MinesweeperLogic:
+        """ the game after its first index moves, replaying at most snapshot_interval moves """
+        index = max(0, min(index, len(self.moves)))
+        base = max((snapshot for snapshot in self.snapshots if snapshot <= index), default=0)
+        logic = self.restore(base) if base else self.new_logic()
+        for kind, row, column in self.moves[base:index]:
+            apply_move(logic, kind, row, column)
+        return logic
+
+    def write_records(self, writer, seed=-1) -> None:
+        """ append this game to a records.GameRecordWriter as training data """
+        logic = self.new_logic()
+        moves = []
+        for kind, row, column in self.moves:
+            revealed = logic.board.revealed.copy()
+            flagged = logic.board.flagged.copy()
+            apply_move(logic, kind, row, column)
+            # the mines only exist once the first reveal has been applied
+            result = -1 if kind == 'reveal' and logic.board.mines[row, column] else 1
+            moves.append((revealed, flagged, row * self.grid_size + column, MOVE_KINDS[kind], result))
+        writer.add_game(seed, logic.board.mines, moves, logic.check_for_win())
+
+    def save(self, path) -> None:
+        meta = {'grid_size': self.grid_size, 'num_mines': self.num_mines, 'rng_state': self.rng_state,
+                'safe_neighborhood': self.safe_neighborhood, 'snapshot_interval': self.snapshot_interval}
+        kinds = np.array([MOVE_KINDS[kind] for kind, _, _ in self.moves], dtype=np.uint8)
+        cells = np.array([(row, column) for _, row, column in self.moves], dtype=np.int32).reshape(-1, 2)
+        indices = sorted(self.snapshots)
+        arrays = {'meta': np.array(json.dumps(meta)), 'kinds': kinds, 'cells': cells,
+                  'snapshot_indices': np.array(indices, dtype=np.int64),
+                  'mines': self.mines if self.mines is not None else np.zeros(0, dtype=np.uint8)}
+        for name in ('revealed', 'flagged', 'counters'):
+            arrays[f'snapshot_{name}'] = np.array([self.snapshots[index][name] for index in indices])
+        with open(path, 'wb') as log_file:
+            np.savez_compressed(log_file, **arrays)
+
+    @classmethod
+    def load(cls, path) -> "GameLog":
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            game_log = cls(meta['grid_size'], meta['num_mines'], meta['rng_state'],
+                           meta['safe_neighborhood'], meta['snapshot_interval'])
+            names = {code: kind for kind, code in MOVE_KINDS.items()}
+            game_log.moves = [(names[int(kind)], int(row), int(column))
+                              for kind, (row, column) in zip(data['kinds'], data['cells'])]
+            if len(data['mines']):
+                game_log.mines = data['mines']
+            for position, index in enumerate(data['snapshot_indices']):
+                game_log.snapshots[int(index)] = {name: data[f'snapshot_{name}'][position]
+                                                  for name in ('revealed', 'flagged', 'counters')}
+        return game_log
+
+
+def apply_move(logic, kind, row, column) -> None:
+    if kind == 'flag':
+        logic.toggle_flag(row, column)
+        return
+    logic.open_cell(row, column)
@@ -0,0 +1,45 @@
+import sys
+import tkinter as tk
+
+from gui import MinesweeperGUI
+from replay import GameLog
+
+class ReplayViewer:
+    """ window that shows a recorded game and can jump to any move with a slider """
+
+    def __init__(self, master, game_log):
+        self.master = master
+        self.game_log = game_log
+        self.logic = game_log.state_at(0)
+        # the board is only ever shown, never clicked
+        self.logic.player = 'AI'
+
+        self.GUI = MinesweeperGUI(master, self)
+        self.GUI.main_gui_setup(self.logic.grid_size)
+        self.master.title("Minesweeper Replay")
+
+        self.slider = tk.Scale(self.GUI.frame, from_=0, to=len(game_log), orient=tk.HORIZONTAL,
+                               showvalue=False, command=lambda value: self.seek(int(value)))
+        self.slider.grid(row=2, column=0, columnspan=2, sticky="ew")
+        # the window was sized for the board and clock alone, so grow it to fit the slider
+        self.GUI.fit_window(self.slider.winfo_reqheight())
+        self.master.bind('<Left>', lambda event: self.slider.set(self.slider.get() - 1))
+        self.master.bind('<Right>', lambda event: self.slider.set(self.slider.get() + 1))
+        self.seek(0)
+
+    def seek(self, index) -> None:
+        self.logic = self.game_log.state_at(index)
+        self.logic.player = 'AI'
+        self.GUI.redraw_board()
+        self.GUI.timer_label.config(text=f"Move: {index}/{len(self.game_log)}")
+        self.GUI.update_game_score()
+
+
+def main():
+    root = tk.Tk()
+    ReplayViewer(root, GameLog.load(sys.argv[1]))
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
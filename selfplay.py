@@ -0,0 +1,212 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+
+import config
+from logic import MinesweeperLogic
+from noguess import generate_no_guess_mines
+from probability import MineProbabilityEngine
+from records import REVEAL, GameRecordWriter, pack_moves
+from solver import MinesweeperSolver
+
+@dataclass
+class GameResult:
+    seed: int
+    won: bool
+    moves: int
+    guesses: int
+    seconds: float
+    # packed move records and the mine plane, kept only when games are being recorded
+    move_records: np.ndarray = None
+    mines: np.ndarray = None
+
+
+class SolverPlayer:
+    """ plays every certain move from the solver and guesses the safest cell when stuck """
+
+    # bumped whenever the player changes how it plays, so tournament caches replay its games
+    VERSION = 1
+
+    def __init__(self, seed=None):
+        self.solver = MinesweeperSolver()
+        self.engine = MineProbabilityEngine()
+        self.known_mines = set()
+
+    def new_game(self) -> None:
+        self.known_mines = set()
+
+    def next_moves(self, board, num_mines) -> tuple:
+        """ return (cells to reveal, whether the move is a guess) """
+        result = self.solver.solve_board(board, num_mines, self.known_mines)
+        self.known_mines |= result.mines
+        safe = [cell for cell in result.safe if not board.revealed[cell]]
+        if safe:
+            return sorted(safe), False
+        return [self.engine.safest_cell(board, num_mines, self.known_mines)], True
+
+
+class RandomPlayer:
+    """ baseline policy that reveals a random hidden cell every move """
+
+    VERSION = 1
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def new_game(self) -> None:
+        pass
+
+    def next_moves(self, board, num_mines) -> tuple:
+        hidden = [(row, col) for row in range(board.rows) for col in range(board.columns)
+                  if not board.revealed[row, col]]
+        return [self.rng.choice(hidden)], True
+
+
+PLAYERS = \
+{
+    'solver': SolverPlayer,
+    'random': RandomPlayer
+}
+
+def new_logic(difficulty, seed, safe_neighborhood=False, no_guess=False) -> MinesweeperLogic:
+    logic = MinesweeperLogic(None, seed=seed)
+    logic.player = 'AI'
+    logic.set_difficulty(config.DIFFICULTIES[difficulty]['size'])
+    logic.set_mines(config.DIFFICULTIES[difficulty]['mines'])
+    logic.set_safe_neighborhood(safe_neighborhood)
+    if no_guess:
+        # generated on the spot from the game's seed so the game stays reproducible; a NoGuessPool
+        # would also set up a queue and an event per game that nothing ever uses
+        rng = np.random.default_rng(seed)
+        size, mines = config.DIFFICULTIES[difficulty]['size'], config.DIFFICULTIES[difficulty]['mines']
+        logic.set_mine_source(lambda row, column: generate_no_guess_mines(size, size, mines, rng, row, column))
+    logic.create_board()
+    return logic
+
+def play_game(player, difficulty, seed, safe_neighborhood=False, record=False, no_guess=False) -> GameResult:
+    """ play one game from a centered first click until it is won or lost
+
+    With record set the game's move records are packed here, so recording
+    runs in the worker processes and the parent only appends them to the file.
+    """
+    start = time.perf_counter()
+    logic = new_logic(difficulty, seed, safe_neighborhood, no_guess)
+    player.new_game()
+    recorded = []
+
+    def play(row, column) -> bool:
+        before = (logic.board.revealed.copy(), logic.board.flagged.copy()) if record else None
+        safe = not logic.open_cell(row, column).is_mine
+        if record:
+            recorded.append(before + (row * logic.grid_size + column, REVEAL, 1 if safe else -1))
+        return safe
+
+    center = logic.grid_size // 2
+    alive = play(center, center)
+    moves, guesses = 1, 0
+    while alive and not logic.check_for_win():
+        cells, guessed = player.next_moves(logic.board, logic.num_mines)
+        guesses += guessed
+        for row, column in cells:
+            # an earlier cascade in this batch may already have opened the cell
+            if logic.board.revealed[row, column]:
+                continue
+            moves += 1
+            alive = play(row, column)
+            if not alive:
+                break
+    result = GameResult(seed, alive, moves, guesses, time.perf_counter() - start)
+    if record:
+        result.move_records = pack_moves(recorded, logic.grid_size, logic.grid_size)
+        result.mines = logic.board.mines.copy()
+    return result
+
+def play_seed_range(player_name, difficulty, seeds, safe_neighborhood=False, record=False, no_guess=False) -> list:
+    """ worker entry point: play a contiguous chunk of seeds with one player instance """
+    player = PLAYERS[player_name](seed=seeds[0] if seeds else None)
+    return [play_game(player, difficulty, seed, safe_neighborhood, record, no_guess) for seed in seeds]
+
+class RunningTotals:
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.moves = 0
+        self.guesses = 0
+        self.game_seconds = 0.0
+
+    def add(self, results) -> None:
+        for result in results:
+            self.games += 1
+            self.wins += result.won
+            self.moves += result.moves
+            self.guesses += result.guesses
+            self.game_seconds += result.seconds
+
+    def summary(self, elapsed) -> str:
+        games = max(self.games, 1)
+        return (f"games: {self.games}  win rate: {self.wins / games:.3f}  "
+                f"moves/game: {self.moves / games:.1f}  guesses/game: {self.guesses / games:.2f}  "
+                f"ms/game: {1000 * self.game_seconds / games:.2f}  games/s: {self.games / max(elapsed, 1e-9):.1f}")
+
+
+def run_self_play(player_name, difficulty, first_seed, num_games, workers=None, chunk_size=50,
+                  safe_neighborhood=False, report=print, record_path=None, no_guess=False) -> RunningTotals:
+    """ spread seed chunks over a process pool and stream aggregated results as chunks finish """
+    writer = None
+    if record_path:
+        size = config.DIFFICULTIES[difficulty]['size']
+        writer = GameRecordWriter(record_path, size, size)
+
+    workers = workers or os.cpu_count()
+    chunks = [list(range(start, min(start + chunk_size, first_seed + num_games)))
+              for start in range(first_seed, first_seed + num_games, chunk_size)]
+
+    totals = RunningTotals()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_seed_range, player_name, difficulty, chunk, safe_neighborhood,
+                               writer is not None, no_guess)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            results = future.result()
+            totals.add(results)
+            if writer:
+                for result in results:
+                    writer.add_packed_game(result.seed, result.mines, result.move_records, result.won)
+            if report:
+                report(totals.summary(time.perf_counter() - start))
+    return totals
+
+def parse_seeds(text) -> tuple:
+    """ 'start:stop' or a plain game count starting at seed 0 """
+    if ':' in text:
+        start, stop = (int(part) for part in text.split(':'))
+        return start, stop - start
+    return 0, int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Minesweeper self-play games across a process pool")
+    parser.add_argument('--difficulty', choices=list(config.DIFFICULTIES.keys()), default='Beginner')
+    parser.add_argument('--seeds', default='0:1000', help="seed range as start:stop, or a number of games")
+    parser.add_argument('--player', choices=list(PLAYERS.keys()), default='solver')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (defaults to the cpu count)")
+    parser.add_argument('--chunk-size', type=int, default=50, help="games handed to a worker at a time")
+    parser.add_argument('--safe-start', action='store_true', help="keep the 3x3 area around the first click free of mines")
+    parser.add_argument('--no-guess', action='store_true', help="only deal boards the solver can clear without guessing")
+    parser.add_argument('--record', default=None, help="append every game to the record files at this path")
+    args = parser.parse_args()
+
+    first_seed, num_games = parse_seeds(args.seeds)
+    start = time.perf_counter()
+    totals = run_self_play(args.player, args.difficulty, first_seed, num_games, args.workers,
+                           args.chunk_size, args.safe_start, record_path=args.record, no_guess=args.no_guess)
+    print(f"done  {totals.summary(time.perf_counter() - start)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+from headless import new_game
+
+HOST = '127.0.0.1'
+PORT = 8765
+# sessions untouched for this many seconds are dropped, checked every EVICTION_INTERVAL seconds
+IDLE_TIMEOUT = 300.0
+EVICTION_INTERVAL = 5.0
+MAX_SESSIONS = 100000
+
+# one character per observed cell code: numbers, hidden, flagged, outside the board and a revealed mine
+SYMBOLS = np.frombuffer(b'012345678#F?*', dtype=np.uint8)
+
+HELP = "commands: new <difficulty> [seed] | reveal <id> <row> <col> | flag <id> <row> <col> | board <id> | close <id> | stats"
+
+class ProtocolError(Exception):
+    pass
+
+
+class Session:
+    __slots__ = ('logic', 'last_used')
+
+    def __init__(self, logic, now):
+        self.logic = logic
+        self.last_used = now
+
+    @property
+    def status(self) -> str:
+        if not self.logic.running:
+            return 'lost'
+        return 'won' if self.logic.check_for_win() else 'playing'
+
+
+class GameServer:
+    """ many independent games behind one asyncio socket server
+
+    Each request is one line and gets exactly one line back, 'ok ...' or
+    'err <message>'. A connection's requests are answered in order, so clients
+    can pipeline by writing many lines before reading any answers. Sessions
+    live in an OrderedDict kept in least recently used order, which lets idle
+    eviction stop at the first session that is still in use.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.next_id = itertools.count(1)
+        self.requests = 0
+        self.evicted = 0
+        self.connections = 0
+
+    def session(self, session_id) -> Session:
+        try:
+            session = self.sessions[int(session_id)]
+        except (KeyError, ValueError):
+            raise ProtocolError(f"no session {session_id}")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(int(session_id))
+        return session
+
+    def cell(self, session, row, column) -> tuple:
+        try:
+            row, column = int(row), int(column)
+        except ValueError:
+            raise ProtocolError("row and column must be numbers")
+        if not (0 <= row < session.logic.grid_size and 0 <= column < session.logic.grid_size):
+            raise ProtocolError("cell is not on the board")
+        if session.status != 'playing':
+            raise ProtocolError("game is over")
+        return row, column
+
+    def new_session(self, difficulty, seed=None) -> str:
+        if difficulty not in config.DIFFICULTIES:
+            raise ProtocolError(f"unknown difficulty {difficulty}")
+        try:
+            seed = int(seed) if seed is not None else None
+        except ValueError:
+            raise ProtocolError("seed must be a number")
+        if seed is not None and seed < 0:
+            raise ProtocolError("seed must not be negative")
+        if len(self.sessions) >= self.max_sessions:
+            # full: the least recently used session makes room
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        session_id = next(self.next_id)
+        logic = new_game(difficulty, seed)
+        self.sessions[session_id] = Session(logic, time.monotonic())
+        return f"{session_id} {logic.grid_size} {logic.grid_size} {logic.num_mines}"
+
+    def handle(self, line) -> str:
+        """ answer one request line """
+        self.requests += 1
+        parts = line.split()
+        if not parts:
+            return f"err {HELP}"
+        command, arguments = parts[0], parts[1:]
+        try:
+            if command == 'new' and 1 <= len(arguments) <= 2:
+                return f"ok {self.new_session(*arguments)}"
+            if command == 'reveal' and len(arguments) == 3:
+                session = self.session(arguments[0])
+                row, column = self.cell(session, *arguments[1:])
+                if not session.logic.board.revealed[row, column]:
+                    session.logic.open_cell(row, column)
+                return f"ok {session.status} {session.logic.revealed_safe_cells}"
+            if command == 'flag' and len(arguments) == 3:
+                session = self.session(arguments[0])
+                row, column = self.cell(session, *arguments[1:])
+                if session.logic.board.revealed[row, column]:
+                    raise ProtocolError("cell is already revealed")
+                return f"ok {session.logic.toggle_flag(row, column)}"
+            if command == 'board' and len(arguments) == 1:
+                session = self.session(arguments[0])
+                codes = SYMBOLS[session.logic.board.observed_codes()].tobytes().decode()
+                return f"ok {session.status} {session.logic.get_score()} {codes}"
+            if command == 'close' and len(arguments) == 1:
+                self.session(arguments[0])
+                del self.sessions[int(arguments[0])]
+                return "ok"
+            if command == 'stats' and not arguments:
+                return (f"ok sessions={len(self.sessions)} requests={self.requests} "
+                        f"evicted={self.evicted} connections={self.connections}")
+        except (ProtocolError, ValueError) as error:
+            # a bad request is answered, never allowed to drop the connection and the requests behind it
+            return f"err {error}"
+        return f"err {HELP}"
+
+    def evict_idle(self, now) -> int:
+        cutoff = now - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self.sessions[session_id]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    async def evict_forever(self, interval=EVICTION_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle(time.monotonic())
+
+    async def handle_client(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write(b"err request line too long\n")
+                    break
+                if not line:
+                    break
+                writer.write(self.handle(line.decode(errors='replace')).encode() + b'\n')
+                # returns at once unless the client has stopped reading its answers
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT, unix_path=None, ready=None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        eviction = asyncio.create_task(self.evict_forever())
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            eviction.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many Minesweeper games over a line based socket protocol")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--unix', default=None, help="listen on this unix socket path instead of tcp")
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT, help="seconds before an unused session is dropped")
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    args = parser.parse_args()
+
+    server = GameServer(args.idle_timeout, args.max_sessions)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
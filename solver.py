@@ -0,0 +1,324 @@
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from board import HIDDEN_CODE, MINE_CODE, NEIGHBOR_OFFSETS, OUTSIDE_CODE, SAFE_CODE, count_neighbors, window_codes
+
+@dataclass
+class StageStats:
+    """ how many cells a solver stage resolved and how long it spent doing it """
+    name: str
+    calls: int = 0
+    resolved: int = 0
+    seconds: float = 0.0
+
+    def add(self, other) -> None:
+        self.calls += other.calls
+        self.resolved += other.resolved
+        self.seconds += other.seconds
+
+
+@dataclass
+class SolverResult:
+    safe: set = field(default_factory=set)
+    mines: set = field(default_factory=set)
+    stages: dict = field(default_factory=dict)
+
+    @property
+    def solved_anything(self) -> bool:
+        return bool(self.safe or self.mines)
+
+
+class MinesweeperSolver:
+    """ deterministic solver that finds certainly safe cells and certain mines
+
+    Stages run cheapest first: single-cell rules, then pairwise subset
+    reduction across overlapping constraints, and exhaustive enumeration only
+    on independent frontier components small enough to enumerate. Whenever a
+    later stage resolves something the pipeline loops back to the cheap rules.
+    Given a transposition.PatternTable, a memoized 5x5 pattern stage runs
+    before the full enumeration.
+    """
+
+    STAGES = ('single', 'subset', 'enumeration')
+    PATTERN_STAGES = ('single', 'subset', 'pattern', 'enumeration')
+
+    def __init__(self, max_component_size=24, stop_at_first=False, pattern_table=None):
+        self.max_component_size = max_component_size
+        # return as soon as any stage finds a move instead of solving to a fixpoint
+        self.stop_at_first = stop_at_first
+        self.pattern_table = pattern_table
+        self.stages = self.STAGES if pattern_table is None else self.PATTERN_STAGES
+        self.stats = {name: StageStats(name) for name in self.stages}
+
+    def solve(self, logic) -> SolverResult:
+        """ solve the current state of a MinesweeperLogic board """
+        return self.solve_board(logic.board, logic.num_mines)
+
+    def solve_board(self, board, num_mines, known_mines=()) -> SolverResult:
+        columns = board.columns
+        state = SolverState(board, num_mines, {row * columns + col for row, col in known_mines})
+        result = SolverResult(stages={name: StageStats(name) for name in self.stages})
+
+        stage_functions = {'single': self.apply_single_rules, 'subset': self.apply_subset_rules,
+                           'pattern': self.apply_pattern_rules, 'enumeration': self.apply_enumeration}
+        stage = 0
+        while stage < len(self.stages):
+            stats = result.stages[self.stages[stage]]
+            start = time.perf_counter()
+            resolved = stage_functions[self.stages[stage]](state)
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            stats.resolved += resolved
+
+            if resolved and self.stop_at_first:
+                break
+            # anything new feeds back into the cheapest rules first
+            stage = 0 if resolved else stage + 1
+
+        for name, stats in result.stages.items():
+            self.stats[name].add(stats)
+
+        result.safe = {divmod(cell, columns) for cell in state.safe}
+        result.mines = {divmod(cell, columns) for cell in state.mines - state.initial_mines}
+        return result
+
+    def apply_single_rules(self, state) -> int:
+        """ a number whose remaining mines are zero or equal to its hidden cells decides them all """
+        safe, mines = set(), set()
+        for cells, count in state.constraints:
+            if count == 0:
+                safe |= cells
+            elif count == len(cells):
+                mines |= cells
+
+        # the total mine count settles the rest of the board once it is exhausted or exact
+        if not safe and not mines:
+            unknown = state.unknown_count()
+            if state.mines_left == 0 and unknown:
+                safe = state.unknown_cells()
+            elif state.mines_left == unknown and unknown:
+                mines = state.unknown_cells()
+        return state.resolve(safe, mines)
+
+    def apply_subset_rules(self, state) -> int:
+        """ compare overlapping constraints to bound the mines in their differences """
+        safe, mines = set(), set()
+        constraints = state.constraints
+        by_cell = {}
+        for index, (cells, _) in enumerate(constraints):
+            for cell in cells:
+                by_cell.setdefault(cell, []).append(index)
+
+        checked = set()
+        for sharing in by_cell.values():
+            for first in sharing:
+                for second in sharing:
+                    if first == second or (first, second) in checked:
+                        continue
+                    checked.add((first, second))
+                    cells_a, count_a = constraints[first]
+                    cells_b, count_b = constraints[second]
+                    only_b = cells_b - cells_a
+                    if not only_b:
+                        continue
+                    overlap = len(cells_a & cells_b)
+                    only_a = len(cells_a) - overlap
+                    # mines in the overlap are at most min(overlap, count_a) and at least count_a - only_a
+                    if count_b - min(overlap, count_a) == len(only_b):
+                        mines |= only_b
+                    elif count_b - max(0, count_a - only_a) == 0:
+                        safe |= only_b
+        return state.resolve(safe, mines)
+
+    def apply_pattern_rules(self, state) -> int:
+        """ look up the local pattern around every frontier cell in the pattern table """
+        radius = self.pattern_table.RADIUS
+        padded = np.pad(state.observed_codes(), radius, constant_values=OUTSIDE_CODE)
+        safe, mines = set(), set()
+        for cell in set().union(*(cells for cells, _ in state.constraints)):
+            row, col = divmod(cell, state.columns)
+            probability = self.pattern_table.center_probability(window_codes(padded, row, col, radius))
+            if probability == 0:
+                safe.add(cell)
+            elif probability == 1:
+                mines.add(cell)
+        return state.resolve(safe, mines)
+
+    def apply_enumeration(self, state) -> int:
+        """ enumerate every consistent mine layout on small independent frontier components """
+        safe, mines = set(), set()
+        for component in state.components():
+            cells, constraints = component
+            if len(cells) > self.max_component_size:
+                continue
+            solutions = enumerate_component(cells, constraints, state.mines_left)
+            total = sum(count for count, _ in solutions.values())
+            if not total:
+                continue
+            mine_counts = sum(cell_counts for _, cell_counts in solutions.values())
+            for cell, count in zip(cells, mine_counts):
+                if count == 0:
+                    safe.add(cell)
+                elif count == total:
+                    mines.add(cell)
+        return state.resolve(safe, mines)
+
+
+class SolverState:
+    """ frontier constraints over hidden cells, reduced as cells get resolved """
+
+    def __init__(self, board, num_mines, known_mines):
+        self.columns = board.columns
+        self.shape = board.shape
+        self.num_mines = num_mines
+        self.initial_mines = set(known_mines)
+
+        self.revealed = board.revealed.ravel()
+        self.adjacent = board.adjacent.ravel()
+        self.revealed_mines = np.flatnonzero(board.revealed & board.mines)
+        self.safe = set()
+        self.mines = set(known_mines)
+
+        self.constraints = []
+        # only revealed cells that still touch hidden cells constrain anything
+        hidden_neighbors = count_neighbors(~board.revealed)
+        constraining = board.revealed & ~board.mines & (hidden_neighbors > 0)
+        for row, col in zip(*np.nonzero(constraining)):
+            cells = set()
+            for row_offset, col_offset in NEIGHBOR_OFFSETS:
+                neighbor_row, neighbor_col = row + row_offset, col + col_offset
+                if board.in_bounds(neighbor_row, neighbor_col) and not board.revealed[neighbor_row, neighbor_col]:
+                    cells.add(int(neighbor_row) * self.columns + int(neighbor_col))
+            self.constraints.append((frozenset(cells), int(board.adjacent[row, col])))
+        self.hidden_total = int(np.count_nonzero(~board.revealed))
+        self.reduce()
+
+    @property
+    def mines_left(self) -> int:
+        return self.num_mines - len(self.mines)
+
+    def unknown_count(self) -> int:
+        return self.hidden_total - len(self.safe) - len(self.mines)
+
+    def unknown_cells(self) -> set:
+        hidden = set(np.flatnonzero(~self.revealed).tolist())
+        return hidden - self.safe - self.mines
+
+    def observed_codes(self) -> np.ndarray:
+        """ board codes with the cells resolved so far marked as mines or safe """
+        codes = np.where(self.revealed, self.adjacent, HIDDEN_CODE).astype(np.uint8)
+        codes[self.revealed_mines] = MINE_CODE
+        codes[list(self.mines)] = MINE_CODE
+        codes[list(self.safe)] = SAFE_CODE
+        return codes.reshape(self.shape)
+
+    def resolve(self, safe, mines) -> int:
+        """ record newly resolved cells and return how many there were """
+        new_safe = safe - self.safe
+        new_mines = mines - self.mines
+        if new_safe & new_mines or self.safe & new_mines or self.mines & new_safe:
+            raise ValueError("contradictory board state")
+        self.safe |= new_safe
+        self.mines |= new_mines
+        if new_safe or new_mines:
+            self.reduce()
+        return len(new_safe) + len(new_mines)
+
+    def reduce(self) -> None:
+        """ drop resolved cells from every constraint and discard the ones left empty """
+        reduced = {}
+        for cells, count in self.constraints:
+            known = cells & self.mines
+            remaining = cells - known - self.safe
+            count -= len(known)
+            if count < 0 or count > len(remaining):
+                raise ValueError("contradictory board state")
+            if remaining:
+                reduced[remaining] = count
+        self.constraints = list(reduced.items())
+
+    def components(self) -> list:
+        """ split the frontier into groups of cells that share no constraint with each other """
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in self.constraints:
+            first = None
+            for cell in cells:
+                parent.setdefault(cell, cell)
+                if first is None:
+                    first = find(cell)
+                else:
+                    root = find(cell)
+                    if root != first:
+                        parent[root] = first
+
+        groups = {}
+        for cells, count in self.constraints:
+            root = find(next(iter(cells)))
+            groups.setdefault(root, []).append((cells, count))
+
+        components = []
+        for constraints in groups.values():
+            cells = sorted(set().union(*(cells for cells, _ in constraints)))
+            components.append((cells, constraints))
+        return components
+
+
+def enumerate_component(cells, constraints, max_mines) -> dict:
+    """ backtrack over every mine layout of a component that satisfies its constraints
+
+    Returns {mines_in_layout: [layout_count, per_cell_mine_counts]} so callers
+    can weight layouts by how many mines they leave for the rest of the board.
+    """
+    position = {cell: index for index, cell in enumerate(cells)}
+    cell_constraints = [[] for _ in cells]
+    targets, sizes = [], []
+    for index, (constraint_cells, count) in enumerate(constraints):
+        for cell in constraint_cells:
+            cell_constraints[position[cell]].append(index)
+        targets.append(count)
+        sizes.append(len(constraint_cells))
+
+    placed = [0] * len(constraints)      # mines assigned so far per constraint
+    unassigned = list(sizes)             # cells not yet assigned per constraint
+    assignment = [0] * len(cells)
+    solutions = {}
+
+    def backtrack(index, mines_used):
+        if index == len(cells):
+            if mines_used not in solutions:
+                solutions[mines_used] = [0, np.zeros(len(cells), dtype=np.int64)]
+            solutions[mines_used][0] += 1
+            solutions[mines_used][1] += assignment
+            return
+        for value in (0, 1):
+            if value and mines_used >= max_mines:
+                continue
+            feasible = True
+            for constraint in cell_constraints[index]:
+                after = placed[constraint] + value
+                if after > targets[constraint] or after + unassigned[constraint] - 1 < targets[constraint]:
+                    feasible = False
+                    break
+            if not feasible:
+                continue
+            for constraint in cell_constraints[index]:
+                placed[constraint] += value
+                unassigned[constraint] -= 1
+            assignment[index] = value
+            backtrack(index + 1, mines_used + value)
+            assignment[index] = 0
+            for constraint in cell_constraints[index]:
+                placed[constraint] -= value
+                unassigned[constraint] += 1
+
+    backtrack(0, 0)
+    return solutions
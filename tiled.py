@@ -0,0 +1,313 @@
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from board import FLAG_CODE, HIDDEN_CODE, MINE_CODE, NEIGHBOR_OFFSETS, count_neighbors, dilate
+
+def ring_slices(offset, size) -> tuple:
+    """ along one axis, the slice of a tile's one cell ring facing a neighbor and the matching slice of that neighbor """
+    return {-1: (slice(0, 1), slice(size - 1, size)),
+            0: (slice(1, size + 1), slice(0, size)),
+            1: (slice(size + 1, size + 2), slice(0, 1))}[offset]
+
+def zigzag(value) -> int:
+    """ map any integer to a distinct non-negative one, as seed sequences only take those """
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+class Tile:
+    """ one tile_size square of a TiledBoard """
+
+    __slots__ = ('mines', 'adjacent', 'revealed', 'flagged', 'touched')
+
+    def __init__(self, mines, adjacent):
+        self.mines = mines
+        self.adjacent = adjacent
+        self.revealed = np.zeros(mines.shape, dtype=bool)
+        self.flagged = np.zeros(mines.shape, dtype=bool)
+        # a touched tile holds player state and can never be evicted
+        self.touched = False
+
+    @property
+    def nbytes(self) -> int:
+        return self.mines.nbytes + self.adjacent.nbytes + self.revealed.nbytes + self.flagged.nbytes
+
+
+class TiledBoard:
+    """ board split into square tiles that only exist once a move reaches them
+
+    The mines of a tile are drawn from a generator seeded with the board seed
+    and the tile position, so any tile can be rebuilt at any time and the
+    board never has to be generated up front. Rows and columns may be None for
+    a board without edges; coordinates can then be any integers.
+
+    Tiles are kept in LRU order. Loading a tile past max_tiles evicts the
+    least recently used tiles that hold no player state; tiles that were
+    revealed into or flagged stay, so memory grows with the explored area
+    instead of the nominal board size. Each tile holds a mine density share
+    of mines rather than a fixed total, which is what lets the board be
+    unbounded; the 3x3 area around the first click is always mine free.
+    """
+
+    def __init__(self, seed, density=0.16, tile_size=32, max_tiles=1024, rows=None, columns=None,
+                 max_cascade_tiles=4096):
+        self.seed = seed
+        self.density = density
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.rows = rows
+        self.columns = columns
+        # a reveal stops spreading after this many tile passes, so an endless empty area cannot hang it
+        self.max_cascade_tiles = max_cascade_tiles
+        # seeds a cut off cascade did not get to, so resume_cascade() can finish the region
+        self.frontier = {}
+
+        self.tiles = OrderedDict()
+        self.safe_zone = None           # (row, column) of the first click
+        self.revealed_safe_cells = 0
+        self.hit_mine = False
+        self.evictions = 0
+
+    def tile_of(self, row, column) -> tuple:
+        return (row // self.tile_size, column // self.tile_size), (row % self.tile_size, column % self.tile_size)
+
+    def in_bounds(self, row, column) -> bool:
+        return ((self.rows is None or 0 <= row < self.rows) and
+                (self.columns is None or 0 <= column < self.columns))
+
+    def tile_mines(self, key) -> np.ndarray:
+        """ the mines of a tile, regenerated from the seed """
+        if key in self.tiles:
+            return self.tiles[key].mines
+        tile_row, tile_column = key
+        rng = np.random.default_rng([self.seed, zigzag(tile_row), zigzag(tile_column)])
+        mines = rng.random((self.tile_size, self.tile_size)) < self.density
+
+        row_start, column_start = tile_row * self.tile_size, tile_column * self.tile_size
+        rows = np.arange(row_start, row_start + self.tile_size)[:, None]
+        columns = np.arange(column_start, column_start + self.tile_size)[None, :]
+        if self.rows is not None:
+            mines &= (rows >= 0) & (rows < self.rows)
+        if self.columns is not None:
+            mines &= (columns >= 0) & (columns < self.columns)
+        if self.safe_zone is not None:
+            safe_row, safe_column = self.safe_zone
+            mines &= ~((abs(rows - safe_row) <= 1) & (abs(columns - safe_column) <= 1))
+        return mines
+
+    def padded_mines(self, key) -> np.ndarray:
+        """ a tile's mines with a one cell ring taken from its eight neighbors """
+        size = self.tile_size
+        padded = np.zeros((size + 2, size + 2), dtype=bool)
+        padded[1:-1, 1:-1] = self.tile_mines(key)
+        tile_row, tile_column = key
+        for row_offset, col_offset in NEIGHBOR_OFFSETS:
+            ring_rows, neighbor_rows = ring_slices(row_offset, size)
+            ring_columns, neighbor_columns = ring_slices(col_offset, size)
+            neighbor = self.tile_mines((tile_row + row_offset, tile_column + col_offset))
+            padded[ring_rows, ring_columns] = neighbor[neighbor_rows, neighbor_columns]
+        return padded
+
+    def build_tile(self, key) -> Tile:
+        padded = self.padded_mines(key)
+        adjacent = count_neighbors(padded)[1:-1, 1:-1]
+        return Tile(padded[1:-1, 1:-1].copy(), adjacent)
+
+    def tile(self, key) -> Tile:
+        """ load a tile, marking it most recently used and evicting clean tiles past the cap """
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+        tile = self.build_tile(key)
+        self.tiles[key] = tile
+        if len(self.tiles) > self.max_tiles:
+            self.evict()
+        return tile
+
+    def evict(self) -> None:
+        # the tile just loaded is never evicted, its caller is about to use it
+        for key in list(self.tiles)[:-1]:
+            if len(self.tiles) <= self.max_tiles:
+                return
+            if not self.tiles[key].touched:
+                del self.tiles[key]
+                self.evictions += 1
+
+    def place_safe_zone(self, row, column) -> None:
+        """ clear the 3x3 area around the first click and rebuild the tiles it affects """
+        self.safe_zone = (row, column)
+        (tile_row, tile_column), _ = self.tile_of(row, column)
+        # pop every tile near the click first so rebuilt numbers never read stale mines
+        nearby = {key: self.tiles.pop(key) for key in list(self.tiles)
+                  if abs(key[0] - tile_row) <= 1 and abs(key[1] - tile_column) <= 1}
+        for key, old in nearby.items():
+            rebuilt = self.build_tile(key)
+            rebuilt.revealed, rebuilt.flagged, rebuilt.touched = old.revealed, old.flagged, old.touched
+            self.tiles[key] = rebuilt
+
+    def is_mine(self, row, column) -> bool:
+        key, (local_row, local_column) = self.tile_of(row, column)
+        return bool(self.tile(key).mines[local_row, local_column])
+
+    def adjacent_mines(self, row, column) -> int:
+        key, (local_row, local_column) = self.tile_of(row, column)
+        return int(self.tile(key).adjacent[local_row, local_column])
+
+    def is_revealed(self, row, column) -> bool:
+        key, (local_row, local_column) = self.tile_of(row, column)
+        return key in self.tiles and bool(self.tiles[key].revealed[local_row, local_column])
+
+    def is_flagged(self, row, column) -> bool:
+        key, (local_row, local_column) = self.tile_of(row, column)
+        return key in self.tiles and bool(self.tiles[key].flagged[local_row, local_column])
+
+    def toggle_flag(self, row, column) -> str:
+        if not self.in_bounds(row, column):
+            raise IndexError("cell is outside the board")
+        key, (local_row, local_column) = self.tile_of(row, column)
+        tile = self.tile(key)
+        if tile.revealed[local_row, local_column]:
+            return 'error'
+        tile.touched = True
+        tile.flagged[local_row, local_column] = not tile.flagged[local_row, local_column]
+        return 'setflag' if tile.flagged[local_row, local_column] else 'unset_flag'
+
+    def reveal(self, row, column) -> int:
+        """ reveal a cell and, when it is empty, everything it opens; returns the number of new safe cells
+
+        A region larger than max_cascade_tiles tile passes is left partly
+        open: cascade_unfinished is then True until resume_cascade() is called.
+        """
+        if not self.in_bounds(row, column):
+            raise IndexError("cell is outside the board")
+        if self.safe_zone is None:
+            self.place_safe_zone(row, column)
+
+        key, (local_row, local_column) = self.tile_of(row, column)
+        tile = self.tile(key)
+        if tile.revealed[local_row, local_column]:
+            return 0
+        if tile.mines[local_row, local_column]:
+            tile.revealed[local_row, local_column] = True
+            tile.touched = True
+            self.hit_mine = True
+            return 0
+
+        seeds = np.zeros((self.tile_size, self.tile_size), dtype=bool)
+        seeds[local_row, local_column] = True
+        opened = self.open_cells({key: seeds})
+        self.revealed_safe_cells += opened
+        return opened
+
+    @property
+    def cascade_unfinished(self) -> bool:
+        return bool(self.frontier)
+
+    def resume_cascade(self) -> int:
+        """ carry on opening the regions an earlier reveal stopped at max_cascade_tiles """
+        pending, self.frontier = self.frontier, {}
+        opened = self.open_cells(pending)
+        self.revealed_safe_cells += opened
+        return opened
+
+    def open_cells(self, pending) -> int:
+        """ flood-fill from seed cells tile by tile, handing spill over the edges to neighbor tiles """
+        size = self.tile_size
+        work = deque(pending)
+        opened = 0
+        passes = 0
+        while work and passes < self.max_cascade_tiles:
+            key = work.popleft()
+            seeds = pending.pop(key)
+            tile = self.tile(key)
+            passes += 1
+
+            inside = self.in_bounds_mask(key)
+            empty = (tile.adjacent == 0) & ~tile.mines & inside
+            region = seeds & empty
+            while True:
+                grown = dilate(region) & empty
+                if np.array_equal(grown, region):
+                    break
+                region = grown
+
+            padded_region = np.zeros((size + 2, size + 2), dtype=bool)
+            padded_region[1:-1, 1:-1] = region
+            spill = dilate(padded_region)
+            newly = (seeds | spill[1:-1, 1:-1]) & ~tile.revealed & ~tile.mines & inside
+            if newly.any():
+                tile.revealed |= newly
+                tile.touched = True
+                opened += int(np.count_nonzero(newly))
+
+            # cells opened on the ring around the tile seed its neighbors
+            tile_row, tile_column = key
+            spill[1:-1, 1:-1] = False
+            for row_offset, col_offset in NEIGHBOR_OFFSETS:
+                ring_rows, neighbor_rows = ring_slices(row_offset, size)
+                ring_columns, neighbor_columns = ring_slices(col_offset, size)
+                edge = spill[ring_rows, ring_columns]
+                if not edge.any():
+                    continue
+                neighbor = (tile_row + row_offset, tile_column + col_offset)
+                neighbor_seeds = np.zeros((size, size), dtype=bool)
+                neighbor_seeds[neighbor_rows, neighbor_columns] = edge
+                neighbor_seeds &= self.in_bounds_mask(neighbor)
+                neighbor_tile = self.tile(neighbor) if neighbor_seeds.any() else None
+                if neighbor_tile is None or not (neighbor_seeds & ~neighbor_tile.revealed).any():
+                    continue
+                if neighbor in pending:
+                    pending[neighbor] |= neighbor_seeds
+                else:
+                    pending[neighbor] = neighbor_seeds
+                    work.append(neighbor)
+
+        # whatever is still pending was cut off by max_cascade_tiles
+        for key, seeds in pending.items():
+            if key in self.frontier:
+                self.frontier[key] |= seeds
+            else:
+                self.frontier[key] = seeds
+        return opened
+
+    def in_bounds_mask(self, key) -> np.ndarray:
+        """ cells of a tile that lie on the board """
+        tile_row, tile_column = key
+        rows = np.arange(tile_row * self.tile_size, (tile_row + 1) * self.tile_size)[:, None]
+        columns = np.arange(tile_column * self.tile_size, (tile_column + 1) * self.tile_size)[None, :]
+        mask = np.ones((self.tile_size, self.tile_size), dtype=bool)
+        if self.rows is not None:
+            mask &= (rows >= 0) & (rows < self.rows)
+        if self.columns is not None:
+            mask &= (columns >= 0) & (columns < self.columns)
+        return mask
+
+    def window_codes(self, row, column, rows, columns) -> np.ndarray:
+        """ observed codes of a rectangle, for drawing a viewport; tiles never loaded read as hidden """
+        codes = np.full((rows, columns), HIDDEN_CODE, dtype=np.uint8)
+        size = self.tile_size
+        for tile_row in range(row // size, (row + rows - 1) // size + 1):
+            for tile_column in range(column // size, (column + columns - 1) // size + 1):
+                tile = self.tiles.get((tile_row, tile_column))
+                if tile is None:
+                    continue
+                # overlap of the tile and the window in board coordinates
+                top, left = max(row, tile_row * size), max(column, tile_column * size)
+                bottom = min(row + rows, (tile_row + 1) * size)
+                right = min(column + columns, (tile_column + 1) * size)
+                tile_slice = (slice(top - tile_row * size, bottom - tile_row * size),
+                              slice(left - tile_column * size, right - tile_column * size))
+                revealed, flagged = tile.revealed[tile_slice], tile.flagged[tile_slice]
+                view = codes[top - row:bottom - row, left - column:right - column]
+                view[revealed] = tile.adjacent[tile_slice][revealed]
+                view[flagged & ~revealed] = FLAG_CODE
+                view[revealed & tile.mines[tile_slice]] = MINE_CODE
+        return codes
+
+    @property
+    def touched_tiles(self) -> int:
+        return sum(tile.touched for tile in self.tiles.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tile.nbytes for tile in self.tiles.values())
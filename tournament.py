@@ -0,0 +1,240 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import config
+from selfplay import PLAYERS, parse_seeds, play_game
+
+# strategy name -> (player factory, version); a factory takes a seed and returns a player
+STRATEGIES = {}
+
+def register_strategy(name, factory, version=None) -> None:
+    """ make a player available to tournaments
+
+    The version defaults to the factory's VERSION attribute. Bump it whenever
+    the strategy plays differently so its cached games are played again.
+    """
+    STRATEGIES[name] = (factory, getattr(factory, 'VERSION', 0) if version is None else version)
+
+for player_name, player_class in PLAYERS.items():
+    register_strategy(player_name, player_class)
+
+def wilson_interval(wins, games, z=1.96) -> tuple:
+    """ confidence interval of a win rate, 95% by default; sound near 0 and 1 unlike the normal approximation """
+    if not games:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+def head_to_head(results, seeds) -> dict:
+    """ (a, b) -> seeds won by a but lost by b, for every ordered pair of strategies
+
+    results maps a strategy name to its {seed: row}. Seeds both strategies won
+    or both lost say nothing about which is stronger and are left out.
+    """
+    return {(a, b): sum(results[a][seed][1] and not results[b][seed][1] for seed in seeds)
+            for a in results for b in results if a != b}
+
+def bradley_terry_ratings(pairs, names, prior=0.5, iterations=200) -> dict:
+    """ Elo-scale ratings fitted to head-to-head wins with the Bradley-Terry model
+
+    Every pair is credited prior wins each way, which keeps the fit finite
+    when one strategy never beats another. A 400 point gap means the stronger
+    strategy takes ten of every eleven seeds where exactly one of the two wins.
+    """
+    wins = {(a, b): pairs.get((a, b), 0) + prior for a in names for b in names if a != b}
+    strength = dict.fromkeys(names, 1.0)
+    for _ in range(iterations):
+        for name in names:
+            games = sum((wins[name, other] + wins[other, name]) / (strength[name] + strength[other])
+                        for other in names if other != name)
+            total = sum(wins[name, other] for other in names if other != name)
+            strength[name] = total / games if games else 1.0
+        # only ratios are identified, so pin the geometric mean at one
+        scale = math.exp(sum(map(math.log, strength.values())) / len(names))
+        strength = {name: value / scale for name, value in strength.items()}
+    return {name: 1500 + 400 * math.log10(value) for name, value in strength.items()}
+
+def play_chunk(factory, difficulty, seeds, no_guess=False) -> list:
+    """ worker entry point: (seed, won, moves, guesses, seconds) for every seed in the chunk
+
+    Each game gets a player seeded with the game's seed, so a result depends
+    only on the strategy and the seed and never on how seeds were chunked.
+    """
+    rows = []
+    for seed in seeds:
+        result = play_game(factory(seed=seed), difficulty, seed, no_guess=no_guess)
+        rows.append((seed, result.won, result.moves, result.guesses, result.seconds))
+    return rows
+
+
+class ResultCache:
+    """ finished games on disk, one json file per strategy version, difficulty and board kind """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+
+    def path(self, name, version, difficulty, no_guess) -> Path:
+        kind = 'noguess' if no_guess else 'random'
+        return self.folder / f"{name}-v{version}-{difficulty}-{kind}.json"
+
+    def load(self, name, version, difficulty, no_guess) -> dict:
+        path = self.path(name, version, difficulty, no_guess)
+        if not path.exists():
+            return {}
+        with open(path) as cache_file:
+            return {int(seed): tuple(row) for seed, row in json.load(cache_file).items()}
+
+    def save(self, name, version, difficulty, no_guess, results) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        path = self.path(name, version, difficulty, no_guess)
+        partial = path.with_suffix('.tmp')
+        with open(partial, 'w') as cache_file:
+            json.dump({str(seed): list(row) for seed, row in results.items()}, cache_file)
+        os.replace(partial, path)
+
+
+class Standing:
+    """ one strategy's totals at one difficulty """
+
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        self.games = 0
+        self.wins = 0
+        self.moves = 0
+        self.guesses = 0
+        self.seconds = 0.0
+        self.cached = 0
+        self.rating = 1500.0
+        # opponent name -> (seeds only this strategy won, seeds only the opponent won)
+        self.versus = {}
+
+    def add(self, row) -> None:
+        _, won, moves, guesses, seconds = row
+        self.games += 1
+        self.wins += won
+        self.moves += moves
+        self.guesses += guesses
+        self.seconds += seconds
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def interval(self) -> tuple:
+        return wilson_interval(self.wins, self.games)
+
+    @property
+    def ms_per_move(self) -> float:
+        return 1000 * self.seconds / self.moves if self.moves else 0.0
+
+    @property
+    def guesses_per_game(self) -> float:
+        return self.guesses / self.games if self.games else 0.0
+
+
+def run_tournament(strategy_names, difficulties, first_seed, num_games, workers=None, chunk_size=25,
+                   cache_folder=None, no_guess=False) -> dict:
+    """ play every strategy on the same seeded boards at every difficulty, reusing cached games
+
+    Boards depend only on the seed, so every strategy sees identical games,
+    and each pair of strategies is compared seed by seed into a rating.
+    Returns {difficulty: [Standing per strategy]}.
+    """
+    cache = ResultCache(cache_folder) if cache_folder else None
+    seeds = range(first_seed, first_seed + num_games)
+
+    known = {}          # (difficulty, name) -> {seed: row} played in an earlier run
+    jobs = []
+    for difficulty in difficulties:
+        for name in strategy_names:
+            factory, version = STRATEGIES[name]
+            known[difficulty, name] = cache.load(name, version, difficulty, no_guess) if cache else {}
+            missing = [seed for seed in seeds if seed not in known[difficulty, name]]
+            jobs += [(difficulty, name, missing[start:start + chunk_size])
+                     for start in range(0, len(missing), chunk_size)]
+
+    played = {key: {} for key in known}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {pool.submit(play_chunk, STRATEGIES[name][0], difficulty, chunk, no_guess): (difficulty, name)
+                       for difficulty, name, chunk in jobs}
+            for future in as_completed(futures):
+                for row in future.result():
+                    played[futures[future]][row[0]] = row
+
+    standings = {}
+    for difficulty in difficulties:
+        standings[difficulty] = []
+        results = {}
+        for name in strategy_names:
+            version = STRATEGIES[name][1]
+            results[name] = {**known[difficulty, name], **played[difficulty, name]}
+            if cache and played[difficulty, name]:
+                cache.save(name, version, difficulty, no_guess, results[name])
+            standing = Standing(name, version)
+            for seed in seeds:
+                standing.add(results[name][seed])
+                standing.cached += seed in known[difficulty, name]
+            standings[difficulty].append(standing)
+
+        pairs = head_to_head(results, seeds)
+        ratings = bradley_terry_ratings(pairs, list(results))
+        for standing in standings[difficulty]:
+            standing.rating = ratings[standing.name]
+            standing.versus = {other: (pairs[standing.name, other], pairs[other, standing.name])
+                               for other in results if other != standing.name}
+    return standings
+
+def format_standings(standings) -> str:
+    lines = []
+    for difficulty, table in standings.items():
+        lines.append(difficulty)
+        lines.append(f"  {'strategy':<12} {'ver':>4} {'games':>6} {'win rate':>9} {'95% interval':>15} "
+                     f"{'rating':>7} {'ms/move':>9} {'guesses/game':>13} {'cached':>7}")
+        table = sorted(table, key=lambda standing: -standing.rating)
+        for standing in table:
+            low, high = standing.interval
+            lines.append(f"  {standing.name:<12} {standing.version:>4} {standing.games:>6} {standing.win_rate:>9.3f} "
+                         f"{f'{low:.3f}-{high:.3f}':>15} {standing.rating:>7.0f} {standing.ms_per_move:>9.3f} "
+                         f"{standing.guesses_per_game:>13.2f} {standing.cached:>7}")
+        # seeds won by the row strategy and lost by the column strategy
+        if len(table) > 1:
+            lines.append(f"  {'head to head':<12} " + ' '.join(f"{standing.name:>12}" for standing in table))
+            for standing in table:
+                cells = (f"{standing.versus[other.name][0]:>12}" if other is not standing else f"{'-':>12}"
+                         for other in table)
+                lines.append(f"  {standing.name:<12} " + ' '.join(cells))
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare solver strategies on identical seeded boards")
+    parser.add_argument('--strategies', nargs='*', choices=list(STRATEGIES.keys()), default=list(STRATEGIES.keys()))
+    parser.add_argument('--difficulties', nargs='*', choices=list(config.DIFFICULTIES.keys()),
+                        default=list(config.DIFFICULTIES.keys()))
+    parser.add_argument('--seeds', default='0:500', help="seed range as start:stop, or a number of games")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (defaults to the cpu count)")
+    parser.add_argument('--chunk-size', type=int, default=25, help="games handed to a worker at a time")
+    parser.add_argument('--cache', default='tournament_cache', help="folder of cached results, '' to disable")
+    parser.add_argument('--no-guess', action='store_true', help="only deal boards the solver can clear without guessing")
+    args = parser.parse_args()
+
+    first_seed, num_games = parse_seeds(args.seeds)
+    start = time.perf_counter()
+    standings = run_tournament(args.strategies, args.difficulties, first_seed, num_games, args.workers,
+                               args.chunk_size, args.cache or None, args.no_guess)
+    print(format_standings(standings))
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+from board import FLAG_CODE, HIDDEN_CODE, MINE_CODE, NEIGHBOR_OFFSETS, pack_codes
+from solver import enumerate_component
+
+class TranspositionTable:
+    """ LRU map from hashable positions to memoized results, counting hits and misses """
+
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+
+class PatternTable(TranspositionTable):
+    """ memoized deductions for the local pattern around a frontier cell
+
+    A pattern is the 5x5 window of codes centered on a hidden cell. Every
+    number in its inner 3x3 has all of its neighbors inside the window, so
+    enumerating the layouts of those numbers alone gives a local mine
+    probability for the center. A local probability of 0 or 1 holds for the
+    whole board as well, which makes those entries safe deductions.
+    """
+
+    RADIUS = 2
+    MISSING = object()
+
+    def center_probability(self, window):
+        """ local mine probability of the window's center, or None when no number constrains it """
+        key = pack_codes(window)
+        probability = self.get(key, self.MISSING)
+        if probability is self.MISSING:
+            probability = local_center_probability(window)
+            self.put(key, probability)
+        return probability
+
+
+def local_center_probability(window):
+    size = len(window)
+    center = (size // 2) * size + size // 2
+    constraints = []
+    for row in range(1, size - 1):
+        for col in range(1, size - 1):
+            count = int(window[row, col])
+            if count > 8:
+                continue
+            cells = set()
+            for row_offset, col_offset in NEIGHBOR_OFFSETS:
+                neighbor = window[row + row_offset, col + col_offset]
+                # flags are only a player's guess, so a flagged cell is as unknown as a hidden one
+                if neighbor == HIDDEN_CODE or neighbor == FLAG_CODE:
+                    cells.add((row + row_offset) * size + col + col_offset)
+                elif neighbor == MINE_CODE:
+                    count -= 1
+            if cells:
+                constraints.append((frozenset(cells), count))
+
+    if not any(center in cells for cells, _ in constraints):
+        return None
+    cells = sorted(set().union(*(cells for cells, _ in constraints)))
+    solutions = enumerate_component(cells, constraints, len(cells))
+    total = sum(count for count, _ in solutions.values())
+    if not total:
+        return None
+    index = cells.index(center)
+    return sum(int(cell_counts[index]) for _, cell_counts in solutions.values()) / total
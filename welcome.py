@@ -1,5 +1,6 @@
 import tkinter as tk
 
+import assets
 import config
 
 class WelcomeScreen:
@@ -16,7 +17,7 @@ class WelcomeScreen:
         if icon_file.endswith('.ico'):
             master.iconbitmap(icon_file)
         else:
-            tt_img = tk.PhotoImage(file=icon_file)
+            tt_img = assets.images.get(master, icon_file)
             master.iconphoto(True, tt_img)
 
         tk.Label(master, text="Welcome to Minesweeper! Choose your difficulty:").pack()
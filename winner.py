@@ -1,4 +1,5 @@
 import tkinter as tk
+import assets
 import config
 
 class WinSplashScreen: 
@@ -11,16 +12,13 @@ class WinSplashScreen:
         
         master.configure(bg='#cccccc')
         
-        # Load the image
-        self.game_over_image = tk.PhotoImage(file=config.winner_png)
+        # decoded once and reused every time the screen is shown
+        self.game_over_image = assets.images.get(master, config.winner_png)
         
         # Determine the size of the image
         image_width = self.game_over_image.width()
         image_height = self.game_over_image.height()
 
-        # Make sure the game over window takes focus over the main application window
-        master.grab_set()
-
         # Label displaying the game over image
         image_label = tk.Label(master, image=self.game_over_image)
         image_label.pack(pady=10)  # Use pack for simplicity
@@ -49,5 +47,3 @@ class WinSplashScreen:
         master.geometry(f"{total_width}x{total_height}+"
                              f"{master.winfo_screenwidth() // 2 - total_width // 2}+"
                              f"{master.winfo_screenheight() // 2 - total_height // 2}")
-        # Disable the main window until the game over screen is closed
-        master.wait_window(master)